@@ -8,14 +8,22 @@ import pandas as pd
 from pathlib import Path
 import tempfile
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from io import BytesIO
 
-from data_structure import BatchProcessor
-from pdf_generator import PDFGenerator
-from s3_manager import S3Manager
-from csv_generator import CatalogGenerator
+from data_structure import BatchProcessor, ParsedBatch
+from csv_generator import CatalogGenerator, CATALOG_LOCK
 from config import Config
 
+# Chunk size used when spooling uploaded Excel files to disk
+UPLOAD_COPY_CHUNK_SIZE = 1024 * 1024
+
+# Upper bound on batches finalized concurrently (their image uploads and PDF
+# image fetches share the fixed-size pools in s3_manager and pdf_generator)
+MAX_BATCH_WORKERS = 16
+
 # Page configuration
 st.set_page_config(
     page_title="Liquidation Blitz",
@@ -64,11 +72,17 @@ def initialize_session_state():
         st.session_state.batch_data = None
     if 'markup_percentage' not in st.session_state:
         st.session_state.markup_percentage = 0.0
+    if 's3_connected' not in st.session_state:
+        st.session_state.s3_connected = False
+    if 'catalog_editor_version' not in st.session_state:
+        st.session_state.catalog_editor_version = 0
 
 
 def get_s3_manager():
     """Get or create S3 manager instance."""
     if st.session_state.s3_manager is None:
+        # Deferred: boto3 is slow to import and not needed to draw the page
+        from s3_manager import S3Manager
         try:
             st.session_state.s3_manager = S3Manager()
         except Exception as e:
@@ -77,37 +91,123 @@ def get_s3_manager():
     return st.session_state.s3_manager
 
 
-def load_catalog():
-    """Load catalog from S3."""
+def _download_catalog(s3_manager) -> pd.DataFrame:
+    """
+    Download catalog from S3 and parse it (empty catalog if none exists).
+
+    Raises if the download fails, so a stale local file is never returned.
+    """
+    catalog_path = s3_manager.download_catalog_from_s3(str(Config.TEMP_DIR / Config.CATALOG_FILENAME))
+
+    if catalog_path is not None:
+        return CatalogGenerator.read_catalog(catalog_path)
+
+    # Create empty catalog
+    return pd.DataFrame(columns=Config.CSV_COLUMNS)
+
+
+def _sync_local_catalog(s3_manager) -> str:
+    """
+    Make the local catalog CSV match S3 before it is modified.
+
+    Reads can be served from the Parquet mirror without downloading the CSV,
+    so after a restart (or an upload from another app instance) the local
+    file may be older than S3; uploading it would drop rows. It is
+    re-downloaded unless it is known to match the current ETag.
+    """
+    catalog_path = Config.TEMP_DIR / Config.CATALOG_FILENAME
+    etag_path = Config.TEMP_DIR / f"{Config.CATALOG_FILENAME}.local.etag"
+
+    etag = s3_manager.get_catalog_etag()
+    if etag is None or not catalog_path.exists() or not etag_path.exists() or etag_path.read_text() != etag:
+        # Raises on failure: the stale file must not be updated and uploaded
+        s3_manager.download_catalog_from_s3(str(catalog_path))
+
+    # Invalidated until the modified catalog has been uploaded
+    etag_path.unlink(missing_ok=True)
+    return str(catalog_path)
+
+
+def _mark_local_catalog_synced(s3_manager):
+    """Record that the local catalog CSV now matches S3 (call after uploading it)."""
+    etag = s3_manager.get_catalog_etag()
+    if etag is not None:
+        (Config.TEMP_DIR / f"{Config.CATALOG_FILENAME}.local.etag").write_text(etag)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_catalog_cached(etag: str, _s3_manager) -> pd.DataFrame:
+    """
+    Download and parse catalog once per S3 ETag.
+
+    A local Parquet mirror tagged with the ETag lets the catalog survive
+    cache expiry and app restarts without another CSV download and parse.
+    Download failures raise, so they are neither cached nor mirrored.
+    """
+    mirror_path = Config.TEMP_DIR / f"{Config.CATALOG_FILENAME}.parquet"
+    etag_path = Config.TEMP_DIR / f"{Config.CATALOG_FILENAME}.etag"
+
+    if mirror_path.exists() and etag_path.exists() and etag_path.read_text() == etag:
+        return pd.read_parquet(mirror_path)
+
+    # Only a verified download is mirrored under the ETag (failures raise)
+    catalog_path = _s3_manager.download_catalog_from_s3(str(Config.TEMP_DIR / Config.CATALOG_FILENAME))
+    if catalog_path is None:
+        raise FileNotFoundError(f"Catalog has ETag {etag} on S3 but its public URL returned 404")
+
+    df = CatalogGenerator.read_catalog(catalog_path)
+    df.to_parquet(mirror_path, index=False)
+    etag_path.write_text(etag)
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def _catalog_to_csv(df: pd.DataFrame) -> bytes:
+    """Serialize catalog for the download button."""
+    return CatalogGenerator.catalog_to_csv_bytes(df)
+
+
+@st.cache_data(show_spinner=False)
+def _catalog_total_value(prices: pd.Series) -> float:
+    """Sum catalog prices; cached so sidebar reruns skip the string parsing."""
+    return float(CatalogGenerator.parse_prices(prices).sum())
+
+
+def load_catalog(force_refresh=False):
+    """
+    Load catalog from S3 (skips download and parse if unchanged).
+
+    The session copy is kept up to date by this app's own writes, so it is
+    returned as-is unless force_refresh is set.
+    """
+    if not force_refresh and st.session_state.catalog_df is not None:
+        return st.session_state.catalog_df
+
     s3_manager = get_s3_manager()
     if s3_manager is None:
         return None
 
     try:
         with st.spinner("Loading catalog from S3..."):
-            catalog_path = str(Config.TEMP_DIR / Config.CATALOG_FILENAME)
-            s3_manager.download_catalog_from_s3(catalog_path)
-
-            if Path(catalog_path).exists():
-                df = pd.read_csv(catalog_path)
-                st.session_state.catalog_df = df
-                return df
+            etag = s3_manager.get_catalog_etag()
+            if etag is None:
+                df = _download_catalog(s3_manager)
             else:
-                # Create empty catalog
-                df = pd.DataFrame(columns=Config.CSV_COLUMNS)
-                st.session_state.catalog_df = df
-                return df
+                df = _load_catalog_cached(etag, s3_manager)
+
+            st.session_state.catalog_df = df
+            return df
     except Exception as e:
         st.error(f"Error loading catalog: {e}")
         return None
 
 
 def process_single_batch(excel_file, file_name, markup_percentage=0.0):
-    """Process a single batch file."""
+    """Process a single batch file (returns None if it can't be parsed)."""
     try:
-        # Save uploaded file temporarily
+        # Save uploaded file temporarily (copied in 1 MB chunks, not read whole)
         with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp_file:
-            tmp_file.write(excel_file.read())
+            shutil.copyfileobj(excel_file, tmp_file, length=UPLOAD_COPY_CHUNK_SIZE)
             tmp_path = tmp_file.name
 
         # Parse Excel
@@ -115,60 +215,75 @@ def process_single_batch(excel_file, file_name, markup_percentage=0.0):
         batch = batch_processor.parse_excel_file(tmp_path)
 
         # Store batch data for review
-        return {
-            'success': True,
-            'batch': batch,
-            'tmp_path': tmp_path,
-            'file_name': file_name
-        }
+        return ParsedBatch(batch=batch, tmp_path=tmp_path, file_name=file_name)
 
     except Exception as e:
-        return {
-            'success': False,
-            'file_name': file_name,
-            'error': str(e)
-        }
+        st.error(f"❌ Could not parse {file_name}: {e}")
+        return None
+
 
+def finalize_batch_processing(batch, tmp_path, markup_percentage=0.0, s3_manager=None):
+    """
+    Generate PDF and update catalog with markup.
 
-def finalize_batch_processing(batch, tmp_path, markup_percentage=0.0):
-    """Generate PDF and update catalog with markup."""
+    The steps run in order: the PDF renders from the uploaded thumbnails and
+    the catalog links to the uploaded PDF. Batches overlap with each other
+    instead (see the batch pool in main()).
+
+    Safe to run from worker threads: Streamlit calls are left to the caller,
+    status messages are collected in the returned dict instead.
+    """
+    messages = []
     try:
-        s3_manager = get_s3_manager()
+        # Deferred: ReportLab/Pillow are only needed once a batch is finalized
+        # (an import failure is reported as this batch's error)
+        from pdf_generator import PDFGenerator
+
+        if s3_manager is None:
+            s3_manager = get_s3_manager()
 
         # Step 0: Apply markup to batch (updates item prices and batch total)
         if markup_percentage > 0:
-            st.info(f"💰 Applying {markup_percentage}% markup to items...")
+            messages.append(f"💰 Applying {markup_percentage}% markup to items...")
             batch.apply_markup(markup_percentage)
 
-        # Step 1: Upload images to S3
-        st.info(f"📸 Uploading images for batch #{batch.summary.lot_number}...")
-        image_urls = [item.image_url for item in batch.items if item.image_url]
-        s3_image_urls = s3_manager.upload_images_batch(image_urls, batch.summary.lot_number)
-
-        # Update batch items with S3 image URLs
-        for idx, item in enumerate(batch.items):
-            if idx < len(s3_image_urls) and s3_image_urls[idx]:
-                item.image_url = s3_image_urls[idx]
-
-        # Step 2: Generate PDF (now with S3 image URLs and markup applied)
-        st.info(f"📄 Generating PDF...")
-        pdf_generator = PDFGenerator()
-        pdf_path = str(Config.OUTPUT_DIR / f"batch_{batch.summary.lot_number}.pdf")
-        pdf_generator.generate_report(batch, pdf_path)
+        lot_number = batch.summary.lot_number
 
-        # Step 3: Upload PDF to S3
-        st.info(f"☁️ Uploading PDF to S3...")
-        pdf_url = s3_manager.upload_pdf_to_s3(pdf_path, batch.summary.lot_number)
+        # Step 1: Upload images (and their small thumbnails) to S3
+        messages.append(f"📸 Uploading images for batch #{lot_number}...")
+        image_urls = [item.image_url for item in batch.items]
+        s3_image_urls = s3_manager.upload_images_batch(image_urls, lot_number)
 
-        # Step 4: Update catalog with markup
-        st.info(f"📋 Updating catalog...")
-        catalog_path = str(Config.TEMP_DIR / Config.CATALOG_FILENAME)
-        catalog_generator = CatalogGenerator()
-        catalog_generator.update_catalog(batch, pdf_url, catalog_path, markup_percentage)
+        # Catalog rows link to the S3 copies of the images (one entry per item);
+        # the PDF renders from the thumbnails instead of full-size images
+        for item, (image_url, thumbnail_url) in zip(batch.items, s3_image_urls):
+            if image_url:
+                item.image_url = image_url
+                item.thumbnail_url = thumbnail_url
 
-        # Step 5: Upload catalog to S3
-        st.info(f"☁️ Uploading catalog to S3...")
-        catalog_url = s3_manager.upload_catalog_to_s3(catalog_path)
+        # Step 2: Generate PDF (markup already applied)
+        messages.append("📄 Generating PDF...")
+        pdf_generator = PDFGenerator()
+        pdf_buffer = BytesIO()
+        pdf_generator.generate_report(batch, pdf_buffer)
+
+        # Step 3: Upload PDF to S3 (straight from memory; the S3 client retries
+        # failed requests). The catalog must never link to a PDF that failed
+        # to upload.
+        messages.append("☁️ Uploading PDF to S3...")
+        pdf_url = s3_manager.upload_pdf_bytes_to_s3(pdf_buffer, lot_number)
+
+        # Step 4 + 5: Update catalog with markup and upload it. The local catalog
+        # file is shared by all batches, so only one thread may touch it at a time.
+        with CATALOG_LOCK:
+            messages.append("📋 Updating catalog...")
+            catalog_path = _sync_local_catalog(s3_manager)
+            catalog_generator = CatalogGenerator()
+            catalog_generator.update_catalog(batch, pdf_url, catalog_path, markup_percentage)
+
+            messages.append("☁️ Uploading catalog to S3...")
+            catalog_url = s3_manager.upload_catalog_to_s3(catalog_path)
+            _mark_local_catalog_synced(s3_manager)
 
         # Clean up temp file
         os.unlink(tmp_path)
@@ -186,13 +301,16 @@ def finalize_batch_processing(batch, tmp_path, markup_percentage=0.0):
             'markup_percentage': markup_percentage,
             'final_price': final_price,
             'pdf_url': pdf_url,
-            'catalog_url': catalog_url
+            'catalog_url': catalog_url,
+            'messages': messages
         }
 
     except Exception as e:
         return {
             'success': False,
-            'error': str(e)
+            'batch_number': batch.summary.lot_number,
+            'error': str(e),
+            'messages': messages
         }
 
 
@@ -213,22 +331,25 @@ def delete_batches_from_catalog(batch_ids_to_delete):
             st.info(f"  - Deleting images...")
             s3_manager.delete_images_from_s3(batch_id)
 
-        # Load current catalog
-        catalog_path = str(Config.TEMP_DIR / Config.CATALOG_FILENAME)
-        s3_manager.download_catalog_from_s3(catalog_path)
-
-        # Read catalog
-        df = pd.read_csv(catalog_path)
+        # Work from the current S3 catalog (the session copy may be stale);
+        # the local file is only re-downloaded if its ETag changed
+        with CATALOG_LOCK:
+            catalog_path = _sync_local_catalog(s3_manager)
+            if Path(catalog_path).exists():
+                df = CatalogGenerator.read_catalog(catalog_path)
+            else:
+                df = pd.DataFrame(columns=Config.CSV_COLUMNS)
 
-        # Filter out selected batches
-        df = df[~df['id'].isin(batch_ids_to_delete)]
+            # Filter out selected batches
+            df = df[~df['id'].isin(set(batch_ids_to_delete))]
 
-        # Save updated catalog
-        df.to_csv(catalog_path, index=False)
+            # Save updated catalog
+            CatalogGenerator.write_catalog(df, catalog_path)
 
-        # Upload to S3
-        st.info(f"  - Updating catalog...")
-        catalog_url = s3_manager.upload_catalog_to_s3(catalog_path)
+            # Upload to S3
+            st.info(f"  - Updating catalog...")
+            catalog_url = s3_manager.upload_catalog_to_s3(catalog_path)
+            _mark_local_catalog_synced(s3_manager)
 
         # Update session state
         st.session_state.catalog_df = df
@@ -242,6 +363,210 @@ def delete_batches_from_catalog(batch_ids_to_delete):
         return False, None
 
 
+@st.fragment
+def _markup_preview(batches):
+    """
+    Markup controls and per-batch pricing preview.
+
+    Runs as a fragment: dragging a slider reruns only this section instead
+    of the whole script.
+    """
+    # Initialize individual markups if not exists
+    if 'individual_markups' not in st.session_state:
+        st.session_state.individual_markups = {}
+
+    # Markup mode toggle
+    col1, col2 = st.columns([2, 3])
+    with col1:
+        markup_mode = st.radio(
+            "Markup Mode:",
+            options=["Global", "Individual"],
+            horizontal=True,
+            key='markup_mode',
+            help="Global: Same markup for all batches | Individual: Custom markup per batch"
+        )
+
+    # Global markup setting (only show if Global mode)
+    if markup_mode == "Global":
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.session_state.markup_percentage = st.slider(
+                "Markup Percentage (%)",
+                min_value=0.0,
+                max_value=100.0,
+                value=st.session_state.markup_percentage,
+                step=0.5,
+                help="Set the markup percentage to add to the base cost"
+            )
+        with col2:
+            st.metric("Markup", f"{st.session_state.markup_percentage}%")
+
+    # Show batch details with pricing
+    st.markdown("**Batch Details:**")
+
+    for batch_data in batches:
+        batch = batch_data.batch
+        base_price = batch.summary.total_client_cost
+        lot_number = str(batch.summary.lot_number)
+
+        # Initialize individual markup for this batch if not exists
+        if lot_number not in st.session_state.individual_markups:
+            st.session_state.individual_markups[lot_number] = st.session_state.markup_percentage
+
+        # Determine which markup to use
+        if markup_mode == "Individual":
+            current_markup = st.session_state.individual_markups[lot_number]
+        else:
+            current_markup = st.session_state.markup_percentage
+
+        markup_amount = base_price * (current_markup / 100.0)
+        final_price = base_price + markup_amount
+
+        with st.expander(f"Batch #{batch.summary.lot_number} - {batch.summary.category}"):
+            # Weight input section (show if weight is estimated)
+            if batch.summary.is_weight_estimated:
+                st.warning(f"⚠️ Weight is estimated ({int(batch.summary.estimated_weight_lbs)} lbs). Enter actual weight for accurate shipping cost.")
+
+                # Initialize weight in session state if not exists
+                if 'batch_weights' not in st.session_state:
+                    st.session_state.batch_weights = {}
+
+                weight_col1, weight_col2 = st.columns([2, 1])
+                with weight_col1:
+                    manual_weight = st.number_input(
+                        f"Actual Weight for Batch #{lot_number} (lbs)",
+                        min_value=0.0,
+                        value=float(st.session_state.batch_weights.get(lot_number, 0.0)),
+                        step=10.0,
+                        key=f"weight_{lot_number}",
+                        help="Enter the actual weight in pounds from shipping documents"
+                    )
+                    st.session_state.batch_weights[lot_number] = manual_weight
+
+                    # Update batch weight if user entered a value
+                    if manual_weight > 0:
+                        batch.summary.total_weight_lbs = manual_weight
+
+                with weight_col2:
+                    if manual_weight > 0:
+                        st.metric("Weight (kg)", f"{manual_weight * 0.453592:.1f}")
+            else:
+                st.success(f"✓ Actual weight: {int(batch.summary.total_weight_lbs)} lbs ({batch.summary.estimated_weight_kg:.1f} kg)")
+
+            # Individual markup slider (only show in Individual mode)
+            if markup_mode == "Individual":
+                st.session_state.individual_markups[lot_number] = st.slider(
+                    f"Markup for Batch #{lot_number} (%)",
+                    min_value=0.0,
+                    max_value=100.0,
+                    value=st.session_state.individual_markups[lot_number],
+                    step=0.5,
+                    key=f"markup_{lot_number}",
+                    help="Set custom markup percentage for this batch"
+                )
+                # Recalculate with updated individual markup
+                current_markup = st.session_state.individual_markups[lot_number]
+                markup_amount = base_price * (current_markup / 100.0)
+                final_price = base_price + markup_amount
+
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                st.write(f"**Category:** {batch.summary.category}")
+                st.write(f"**Units:** {batch.summary.total_units}")
+                st.write(f"**Location:** {batch.summary.location}")
+
+            with col2:
+                st.write(f"**Base Cost:** ${int(base_price):,d}")
+                st.write(f"**Markup:** +${int(markup_amount):,d} ({current_markup}%)")
+                st.write(f"**Final Price:** ${int(final_price):,d}")
+
+            with col3:
+                profit = batch.summary.total_original_retail - final_price
+                savings_pct = (profit / batch.summary.total_original_retail * 100) if batch.summary.total_original_retail > 0 else 0
+                st.write(f"**Original Retail:** ${int(batch.summary.total_original_retail):,d}")
+                st.write(f"**Customer Savings:** ${int(profit):,d}")
+                st.write(f"**Savings %:** {savings_pct:.1f}%")
+
+
+def _clear_catalog_selection():
+    """Reset the Manage Catalog selection (a fresh editor key drops edits)."""
+    st.session_state.catalog_editor_version += 1
+
+
+@st.fragment
+def _manage_catalog():
+    """Manage Catalog tab; selecting rows reruns only this fragment."""
+    st.header("Manage Catalog")
+    st.markdown("View and delete batches from the catalog.")
+
+    if st.button("🔄 Load Catalog from S3"):
+        if load_catalog(force_refresh=True) is not None:
+            # Full rerun: sidebar catalog stats live outside this fragment
+            st.rerun()
+
+    if st.session_state.catalog_df is not None:
+        df = st.session_state.catalog_df
+
+        if len(df) == 0:
+            st.info("📭 Catalog is empty. Upload some batches to get started!")
+        else:
+            st.subheader(f"Current Catalog ({len(df)} batches)")
+
+            # Display catalog with selection
+            st.markdown("**Select batches to delete:**")
+
+            # Create selection dataframe (one editable table instead of a
+            # checkbox and button widget per row)
+            display_df = df[['id', 'title', 'price', 'condition', 'availability', 'link']].copy()
+            display_df.columns = ['Batch ID', 'Title', 'Price', 'Condition', 'Availability', 'PDF']
+            display_df.insert(0, 'Select', False)
+
+            edited_df = st.data_editor(
+                display_df,
+                column_config={
+                    'Select': st.column_config.CheckboxColumn('Select', default=False),
+                    'PDF': st.column_config.LinkColumn('PDF', display_text='View PDF')
+                },
+                # Only the checkbox column is editable
+                disabled=[column for column in display_df.columns if column != 'Select'],
+                hide_index=True,
+                use_container_width=True,
+                key=f"catalog_editor_{st.session_state.catalog_editor_version}"
+            )
+
+            # Multi-select for deletion
+            selected_indices = edited_df.index[edited_df['Select']].tolist()
+
+            # Delete selected
+            if selected_indices:
+                st.markdown("---")
+                st.warning(f"⚠️ {len(selected_indices)} batch(es) selected for deletion")
+
+                batch_ids_to_delete = df.loc[selected_indices, 'id'].tolist()
+                st.write("**Batches to delete:**", ", ".join(map(str, batch_ids_to_delete)))
+
+                # Show what will be deleted
+                st.info("**This will delete:**\n"
+                       "- Catalog entry (CSV row)\n"
+                       "- PDF file from S3\n"
+                       "- All images from S3")
+
+                col1, col2 = st.columns([1, 4])
+                with col1:
+                    if st.button("🗑️ Delete Selected", type="primary"):
+                        with st.spinner("Deleting..."):
+                            success, catalog_url = delete_batches_from_catalog(batch_ids_to_delete)
+                            if success:
+                                st.session_state.catalog_editor_version += 1
+                                # Full rerun: sidebar catalog stats live outside this fragment
+                                st.rerun()
+                with col2:
+                    st.button("Cancel", on_click=_clear_catalog_selection)
+    else:
+        st.info("Click 'Load Catalog from S3' to view catalog")
+
+
 def main():
     """Main Streamlit application."""
     initialize_session_state()
@@ -259,9 +584,11 @@ def main():
             Config.validate()
             st.success("✅ AWS configured")
 
-            # Test S3 connection
-            s3_manager = get_s3_manager()
-            if s3_manager and s3_manager.check_connection():
+            # Test S3 connection (once per session, not on every rerun)
+            if not st.session_state.s3_connected:
+                s3_manager = get_s3_manager()
+                st.session_state.s3_connected = bool(s3_manager and s3_manager.check_connection())
+            if st.session_state.s3_connected:
                 st.success("✅ S3 connected")
             else:
                 st.error("❌ S3 connection failed")
@@ -275,16 +602,14 @@ def main():
         # Statistics
         st.header("📊 Catalog Stats")
         if st.button("Refresh Catalog"):
-            load_catalog()
+            load_catalog(force_refresh=True)
 
         if st.session_state.catalog_df is not None:
             df = st.session_state.catalog_df
             st.metric("Total Batches", len(df))
 
             if len(df) > 0 and 'price' in df.columns:
-                # Parse prices (remove commas and USD)
-                prices = df['price'].str.replace(' USD', '').str.replace(',', '').astype(float)
-                total_value = prices.sum()
+                total_value = _catalog_total_value(df['price'])
                 st.metric("Total Value", f"${int(total_value):,d}")
 
     # Main content tabs
@@ -315,145 +640,29 @@ def main():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
 
-                parsed_batches = []
+                parsed_batches = [None] * len(uploaded_files)
 
                 for idx, uploaded_file in enumerate(uploaded_files):
                     status_text.text(f"Parsing {uploaded_file.name}...")
-                    result = process_single_batch(uploaded_file, uploaded_file.name)
-
-                    if result['success']:
-                        parsed_batches.append(result)
-
+                    parsed_batches[idx] = process_single_batch(uploaded_file, uploaded_file.name)
                     progress_bar.progress((idx + 1) / len(uploaded_files))
 
+                parsed_batches = [parsed for parsed in parsed_batches if parsed is not None]
+
                 status_text.empty()
                 progress_bar.empty()
 
+                # Step 2 below renders from session state in this same run
                 if parsed_batches:
                     st.session_state.batch_data = parsed_batches
                     st.success(f"✅ Parsed {len(parsed_batches)} batch(es) successfully!")
-                    st.rerun()
 
         # Step 3: Review and Set Markup
         if st.session_state.batch_data:
             st.markdown("---")
             st.subheader("Step 2: Review Batches & Set Markup")
 
-            # Initialize individual markups if not exists
-            if 'individual_markups' not in st.session_state:
-                st.session_state.individual_markups = {}
-
-            # Markup mode toggle
-            col1, col2 = st.columns([2, 3])
-            with col1:
-                markup_mode = st.radio(
-                    "Markup Mode:",
-                    options=["Global", "Individual"],
-                    horizontal=True,
-                    help="Global: Same markup for all batches | Individual: Custom markup per batch"
-                )
-
-            # Global markup setting (only show if Global mode)
-            if markup_mode == "Global":
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.session_state.markup_percentage = st.slider(
-                        "Markup Percentage (%)",
-                        min_value=0.0,
-                        max_value=100.0,
-                        value=st.session_state.markup_percentage,
-                        step=0.5,
-                        help="Set the markup percentage to add to the base cost"
-                    )
-                with col2:
-                    st.metric("Markup", f"{st.session_state.markup_percentage}%")
-
-            # Show batch details with pricing
-            st.markdown("**Batch Details:**")
-
-            for idx, batch_data in enumerate(st.session_state.batch_data):
-                batch = batch_data['batch']
-                base_price = batch.summary.total_client_cost
-                lot_number = str(batch.summary.lot_number)
-
-                # Initialize individual markup for this batch if not exists
-                if lot_number not in st.session_state.individual_markups:
-                    st.session_state.individual_markups[lot_number] = st.session_state.markup_percentage
-
-                # Determine which markup to use
-                if markup_mode == "Individual":
-                    current_markup = st.session_state.individual_markups[lot_number]
-                else:
-                    current_markup = st.session_state.markup_percentage
-
-                markup_amount = base_price * (current_markup / 100.0)
-                final_price = base_price + markup_amount
-
-                with st.expander(f"Batch #{batch.summary.lot_number} - {batch.summary.category}"):
-                    # Weight input section (show if weight is estimated)
-                    if batch.summary.is_weight_estimated:
-                        st.warning(f"⚠️ Weight is estimated ({int(batch.summary.estimated_weight_lbs)} lbs). Enter actual weight for accurate shipping cost.")
-
-                        # Initialize weight in session state if not exists
-                        if 'batch_weights' not in st.session_state:
-                            st.session_state.batch_weights = {}
-
-                        weight_col1, weight_col2 = st.columns([2, 1])
-                        with weight_col1:
-                            manual_weight = st.number_input(
-                                f"Actual Weight for Batch #{lot_number} (lbs)",
-                                min_value=0.0,
-                                value=float(st.session_state.batch_weights.get(lot_number, 0.0)),
-                                step=10.0,
-                                key=f"weight_{lot_number}",
-                                help="Enter the actual weight in pounds from shipping documents"
-                            )
-                            st.session_state.batch_weights[lot_number] = manual_weight
-
-                            # Update batch weight if user entered a value
-                            if manual_weight > 0:
-                                batch.summary.total_weight_lbs = manual_weight
-
-                        with weight_col2:
-                            if manual_weight > 0:
-                                st.metric("Weight (kg)", f"{manual_weight * 0.453592:.1f}")
-                    else:
-                        st.success(f"✓ Actual weight: {int(batch.summary.total_weight_lbs)} lbs ({batch.summary.estimated_weight_kg:.1f} kg)")
-
-                    # Individual markup slider (only show in Individual mode)
-                    if markup_mode == "Individual":
-                        st.session_state.individual_markups[lot_number] = st.slider(
-                            f"Markup for Batch #{lot_number} (%)",
-                            min_value=0.0,
-                            max_value=100.0,
-                            value=st.session_state.individual_markups[lot_number],
-                            step=0.5,
-                            key=f"markup_{lot_number}",
-                            help="Set custom markup percentage for this batch"
-                        )
-                        # Recalculate with updated individual markup
-                        current_markup = st.session_state.individual_markups[lot_number]
-                        markup_amount = base_price * (current_markup / 100.0)
-                        final_price = base_price + markup_amount
-
-                    col1, col2, col3 = st.columns(3)
-
-                    with col1:
-                        st.write(f"**Category:** {batch.summary.category}")
-                        st.write(f"**Units:** {batch.summary.total_units}")
-                        st.write(f"**Location:** {batch.summary.location}")
-
-                    with col2:
-                        st.write(f"**Base Cost:** ${int(base_price):,d}")
-                        st.write(f"**Markup:** +${int(markup_amount):,d} ({current_markup}%)")
-                        st.write(f"**Final Price:** ${int(final_price):,d}")
-
-                    with col3:
-                        profit = batch.summary.total_original_retail - final_price
-                        savings_pct = (profit / batch.summary.total_original_retail * 100) if batch.summary.total_original_retail > 0 else 0
-                        st.write(f"**Original Retail:** ${int(batch.summary.total_original_retail):,d}")
-                        st.write(f"**Customer Savings:** ${int(profit):,d}")
-                        st.write(f"**Savings %:** {savings_pct:.1f}%")
+            _markup_preview(st.session_state.batch_data)
 
             # Step 4: Generate PDF and Upload
             st.markdown("---")
@@ -463,25 +672,39 @@ def main():
                 progress_bar = st.progress(0)
                 status_text = st.empty()
 
-                results = []
+                batches = st.session_state.batch_data
+                s3_manager = get_s3_manager()
+                results = [None] * len(batches)
 
-                for idx, batch_data in enumerate(st.session_state.batch_data):
-                    batch = batch_data['batch']
-                    tmp_path = batch_data['tmp_path']
-                    lot_number = str(batch.summary.lot_number)
+                status_text.text(f"Processing {len(batches)} batch(es)...")
 
-                    status_text.text(f"Processing batch #{batch.summary.lot_number}...")
+                markup_mode = st.session_state.get('markup_mode', "Global")
 
-                    # Use individual markup if available, otherwise use global
-                    if markup_mode == "Individual" and lot_number in st.session_state.individual_markups:
-                        batch_markup = st.session_state.individual_markups[lot_number]
-                    else:
-                        batch_markup = st.session_state.markup_percentage
+                # Batches are I/O bound (S3 uploads, image downloads), so run them
+                # concurrently. Streamlit calls stay on this thread.
+                with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, len(batches))) as pool:
+                    futures = {}
+                    for idx, batch_data in enumerate(batches):
+                        batch = batch_data.batch
+                        lot_number = str(batch.summary.lot_number)
 
-                    result = finalize_batch_processing(batch, tmp_path, batch_markup)
-                    results.append(result)
+                        # Use individual markup if available, otherwise use global
+                        if markup_mode == "Individual" and lot_number in st.session_state.individual_markups:
+                            batch_markup = st.session_state.individual_markups[lot_number]
+                        else:
+                            batch_markup = st.session_state.markup_percentage
 
-                    progress_bar.progress((idx + 1) / len(st.session_state.batch_data))
+                        future = pool.submit(
+                            finalize_batch_processing,
+                            batch, batch_data.tmp_path, batch_markup, s3_manager
+                        )
+                        futures[future] = idx
+
+                    for completed, future in enumerate(as_completed(futures), start=1):
+                        result = future.result()
+                        results[futures[future]] = result
+                        status_text.text(f"Finished batch #{result['batch_number']}")
+                        progress_bar.progress(completed / len(batches))
 
                 status_text.empty()
                 progress_bar.empty()
@@ -493,6 +716,8 @@ def main():
 
                     for result in successful:
                         with st.expander(f"Batch #{result['batch_number']} Details"):
+                            for message in result['messages']:
+                                st.caption(message)
                             col1, col2 = st.columns(2)
                             with col1:
                                 st.write(f"**Category:** {result['category']}")
@@ -515,89 +740,22 @@ def main():
                 if failed:
                     st.error(f"❌ Failed to process {len(failed)} batch(es)")
                     for result in failed:
-                        st.error(result['error'])
+                        st.error(f"Batch #{result['batch_number']}: {result['error']}")
 
                 # Clear session data
                 st.session_state.batch_data = None
-                load_catalog()
+                load_catalog(force_refresh=True)
 
     # Tab 2: Manage Catalog
     with tab2:
-        st.header("Manage Catalog")
-        st.markdown("View and delete batches from the catalog.")
-
-        if st.button("🔄 Load Catalog from S3"):
-            load_catalog()
-
-        if st.session_state.catalog_df is not None:
-            df = st.session_state.catalog_df
-
-            if len(df) == 0:
-                st.info("📭 Catalog is empty. Upload some batches to get started!")
-            else:
-                st.subheader(f"Current Catalog ({len(df)} batches)")
-
-                # Display catalog with selection
-                st.markdown("**Select batches to delete:**")
-
-                # Create selection dataframe
-                display_df = df[['id', 'title', 'price', 'condition', 'availability']].copy()
-                display_df.columns = ['Batch ID', 'Title', 'Price', 'Condition', 'Availability']
-
-                # Multi-select for deletion
-                selected_indices = []
-
-                for idx, row in display_df.iterrows():
-                    col1, col2, col3, col4, col5, col6 = st.columns([1, 4, 2, 2, 2, 1])
-
-                    with col1:
-                        if st.checkbox("", key=f"select_{idx}"):
-                            selected_indices.append(idx)
-                    with col2:
-                        st.write(row['Batch ID'])
-                    with col3:
-                        st.write(row['Title'][:30] + "..." if len(row['Title']) > 30 else row['Title'])
-                    with col4:
-                        st.write(row['Price'])
-                    with col5:
-                        st.write(row['Condition'])
-                    with col6:
-                        if st.button("🔗", key=f"link_{idx}", help="View PDF"):
-                            st.code(df.loc[idx, 'link'], language=None)
-
-                # Delete selected
-                if selected_indices:
-                    st.markdown("---")
-                    st.warning(f"⚠️ {len(selected_indices)} batch(es) selected for deletion")
-
-                    batch_ids_to_delete = df.loc[selected_indices, 'id'].tolist()
-                    st.write("**Batches to delete:**", ", ".join(map(str, batch_ids_to_delete)))
-
-                    # Show what will be deleted
-                    st.info("**This will delete:**\n"
-                           "- Catalog entry (CSV row)\n"
-                           "- PDF file from S3\n"
-                           "- All images from S3")
-
-                    col1, col2 = st.columns([1, 4])
-                    with col1:
-                        if st.button("🗑️ Delete Selected", type="primary"):
-                            with st.spinner("Deleting..."):
-                                success, catalog_url = delete_batches_from_catalog(batch_ids_to_delete)
-                                if success:
-                                    st.rerun()
-                    with col2:
-                        if st.button("Cancel"):
-                            st.rerun()
-        else:
-            st.info("Click 'Load Catalog from S3' to view catalog")
+        _manage_catalog()
 
     # Tab 3: View Catalog
     with tab3:
         st.header("View Complete Catalog")
 
         if st.button("🔄 Reload Catalog"):
-            load_catalog()
+            load_catalog(force_refresh=True)
 
         if st.session_state.catalog_df is not None:
             df = st.session_state.catalog_df
@@ -613,10 +771,9 @@ def main():
                 )
 
                 # Download button
-                csv = df.to_csv(index=False)
                 st.download_button(
                     label="📥 Download Catalog CSV",
-                    data=csv,
+                    data=_catalog_to_csv(df),
                     file_name=f"liquidation_catalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                     mime="text/csv"
                 )
@@ -5,6 +5,7 @@ Supports both .env files and Streamlit secrets.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -18,17 +19,22 @@ try:
 except ImportError:
     USE_STREAMLIT_SECRETS = False
 
+# Resolve the secrets object once instead of on every lookup
+_SECRETS = getattr(st, 'secrets', None) if USE_STREAMLIT_SECRETS else None
 
+
+@lru_cache(maxsize=None)
 def _get_config_value(key: str, default: str = '') -> str:
     """
     Get configuration value from Streamlit secrets or environment variables.
     Priority: Streamlit secrets > Environment variables > Default
+    Results are memoized, so each key is resolved (and secrets parsed) once.
     """
     # Try Streamlit secrets first (if available)
-    if USE_STREAMLIT_SECRETS:
+    if _SECRETS is not None:
         try:
-            if hasattr(st, 'secrets') and key in st.secrets:
-                return st.secrets[key]
+            if key in _SECRETS:
+                return _SECRETS[key]
         except Exception:
             pass
 
@@ -93,6 +99,9 @@ class Config:
         'DEFAULT': 'Apparel & Accessories'
     }
 
+    # Same mapping keyed by casefolded category, built once for lookups
+    _CATEGORY_MAPPING_FOLDED = {k.casefold(): v for k, v in CATEGORY_MAPPING.items()}
+
     @classmethod
     def validate(cls):
         """Validate required configuration settings."""
@@ -124,8 +133,8 @@ class Config:
     @classmethod
     def get_google_category(cls, excel_category: str) -> str:
         """Map Excel category to Google Product Category."""
-        return cls.CATEGORY_MAPPING.get(
-            excel_category.upper(),
+        return cls._CATEGORY_MAPPING_FOLDED.get(
+            excel_category.casefold(),
             cls.CATEGORY_MAPPING['DEFAULT']
         )
 
@@ -4,10 +4,13 @@ Creates and updates Google Shopping Feed format catalog.
 """
 
 import csv
+import threading
+from itertools import islice
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from pathlib import Path
-from typing import List, Optional
-from collections import Counter
+from typing import Dict, List, Tuple
 import logging
 
 from data_structure import LiquidationBatch
@@ -17,6 +20,18 @@ from config import Config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Write buffer for csv-module appends (fewer write syscalls on large batches)
+CSV_WRITE_BUFFER_SIZE = 1 << 20
+
+# Serializes read-modify-upload of the shared local catalog file. Lives here
+# rather than in app.py, which Streamlit re-executes on every rerun, so one
+# lock is shared by all sessions and worker threads in the process.
+CATALOG_LOCK = threading.Lock()
+
+# Catalog path -> (file signature, header, {batch id: price}). Module level so
+# the index survives across generators (the app creates one per batch).
+_catalog_index: Dict[str, Tuple[Tuple[int, int], List[str], Dict[str, str]]] = {}
+
 
 class CatalogGenerator:
     """Generates and updates CSV catalog in Google Shopping Feed format."""
@@ -24,6 +39,10 @@ class CatalogGenerator:
     def __init__(self):
         """Initialize catalog generator with column definitions."""
         self.columns = Config.CSV_COLUMNS
+        self._id_pos = self.columns.index('id')
+        self._price_pos = self.columns.index('price')
+        # Rows queued by stage_batch() until commit()
+        self._pending: List[list] = []
 
     def update_catalog(
         self,
@@ -31,7 +50,7 @@ class CatalogGenerator:
         pdf_url: str,
         catalog_path: str,
         markup_percentage: float = 0.0
-    ) -> str:
+    ) -> Tuple[str, dict]:
         """
         Update or create catalog CSV with batch information.
 
@@ -42,30 +61,156 @@ class CatalogGenerator:
             markup_percentage: Markup percentage to add to price (default: 0.0)
 
         Returns:
-            Path to updated catalog file
+            Tuple of (path to updated catalog file, catalog statistics as
+            returned by get_catalog_stats)
+        """
+        self.stage_batch(batch, pdf_url, markup_percentage)
+        return self.commit(catalog_path)
+
+    def stage_batch(
+        self,
+        batch: LiquidationBatch,
+        pdf_url: str,
+        markup_percentage: float = 0.0
+    ) -> None:
+        """
+        Queue a batch row to be written by the next commit().
+
+        Args:
+            batch: LiquidationBatch object with all batch data
+            pdf_url: Public URL to PDF report on S3
+            markup_percentage: Markup percentage to add to price (default: 0.0)
         """
-        # Load existing catalog or create new
-        catalog_df = self._load_or_create_catalog(catalog_path)
+        self._pending.append(self._create_batch_row(batch, pdf_url, markup_percentage))
 
-        # Create row data for this batch
-        batch_row = self._create_batch_row(batch, pdf_url, markup_percentage)
+    def commit(self, catalog_path: str) -> Tuple[str, dict]:
+        """
+        Write all staged batch rows to the catalog CSV in one pass.
 
-        # Check if batch ID exists
-        batch_id = batch.summary.lot_number
-        if batch_id in catalog_df['id'].values:
-            # Replace existing row
-            logger.info(f"Batch {batch_id} exists - replacing row")
-            catalog_df = catalog_df[catalog_df['id'] != batch_id]
+        New batches are appended; if any staged batch already exists, the
+        catalog is loaded once and rewritten with those rows replaced in place.
 
-        # Add new row
-        new_row_df = pd.DataFrame([batch_row])
-        catalog_df = pd.concat([catalog_df, new_row_df], ignore_index=True)
+        Args:
+            catalog_path: Path to catalog CSV file
 
-        # Save updated catalog
-        catalog_df.to_csv(catalog_path, index=False)
+        Returns:
+            Tuple of (path to updated catalog file, catalog statistics as
+            returned by get_catalog_stats)
+        """
+        # Later rows for the same batch win
+        rows = {str(row[self._id_pos]): row for row in self._pending}
+        self._pending = []
+        if not rows:
+            return catalog_path, self.get_catalog_stats(catalog_path)
+
+        # Check which batch IDs exist (streams the id and price columns only)
+        header, index, has_duplicates = self._read_catalog_index(catalog_path)
+        replaced_ids = index.keys() & rows.keys()
+
+        if replaced_ids or has_duplicates:
+            # Replace existing rows - requires a full rewrite
+            if replaced_ids:
+                logger.info(f"Batch(es) {', '.join(sorted(replaced_ids))} exist - replacing rows")
+            catalog_df = self._load_or_create_catalog(catalog_path)
+            missing = [column for column in self.columns if column not in catalog_df.columns]
+            if missing:
+                catalog_df = catalog_df.reindex(columns=[*catalog_df.columns, *missing], fill_value='')
+
+            # Older catalogs can hold several rows per batch ID (int/str ID
+            # mismatch); keep only the latest so each ID is replaced once
+            if has_duplicates:
+                logger.warning("Catalog has duplicate batch IDs - keeping the latest row for each")
+                catalog_df = catalog_df.drop_duplicates(subset='id', keep='last', ignore_index=True)
+
+            # Overwrite existing rows where they are; only new batches are added
+            positions = {batch_id: pos for pos, batch_id in enumerate(catalog_df['id'])}
+            new_rows = []
+            for batch_id, row in rows.items():
+                if batch_id in positions:
+                    catalog_df.loc[catalog_df.index[positions[batch_id]], self.columns] = row
+                else:
+                    new_rows.append(row)
+
+            if new_rows:
+                new_rows_df = pd.DataFrame(new_rows, columns=self.columns)
+                catalog_df = pd.concat([catalog_df, new_rows_df], ignore_index=True)
+            self.write_catalog(catalog_df, catalog_path)
+
+            header = list(catalog_df.columns)
+            index = dict(zip(catalog_df['id'].astype(str), catalog_df['price'].fillna('').astype(str)))
+        else:
+            # New batches only - append the rows, cost independent of catalog size
+            self._append_rows(list(rows.values()), catalog_path, header)
+
+            header = header or self.columns
+            index.update((batch_id, row[self._price_pos]) for batch_id, row in rows.items())
+
+        self._remember_index(catalog_path, header, index)
         logger.info(f"Catalog updated successfully: {catalog_path}")
 
-        return catalog_path
+        return catalog_path, self._index_stats(index)
+
+    @staticmethod
+    def parse_prices(prices: pd.Series) -> pd.Series:
+        """
+        Convert catalog price strings (e.g. "9,622 USD") to floats.
+
+        Args:
+            prices: Price column from the catalog
+
+        Returns:
+            Float Series (NaN for unparseable values)
+        """
+        numbers = prices.astype(str).str.removesuffix(' USD').str.replace(',', '', regex=False)
+        return pd.to_numeric(numbers, errors='coerce')
+
+    @staticmethod
+    def read_catalog(catalog_path: str) -> pd.DataFrame:
+        """
+        Read catalog CSV using PyArrow's multithreaded reader.
+
+        All feed columns are read as text, so ids stay comparable with
+        BatchSummary.lot_number and empty cells come back as ''.
+
+        Args:
+            catalog_path: Path to catalog CSV file
+
+        Returns:
+            DataFrame with catalog data
+        """
+        convert_options = pacsv.ConvertOptions(
+            column_types={column: pa.string() for column in Config.CSV_COLUMNS}
+        )
+        return pacsv.read_csv(catalog_path, convert_options=convert_options).to_pandas()
+
+    @staticmethod
+    def write_catalog(df: pd.DataFrame, destination) -> None:
+        """
+        Write catalog DataFrame as CSV using PyArrow's vectorized writer.
+
+        Args:
+            df: Catalog DataFrame
+            destination: File path or writable binary stream
+        """
+        # Every feed column is text; normalizing avoids mixed-type columns
+        # (e.g. int ids read back from CSV next to new string ids)
+        table = pa.Table.from_pandas(df.fillna('').astype(str), preserve_index=False)
+        pacsv.write_csv(table, destination)
+
+    @staticmethod
+    def catalog_to_csv_bytes(df: pd.DataFrame) -> bytes:
+        """
+        Serialize catalog DataFrame to CSV bytes (e.g. for downloads).
+
+        Args:
+            df: Catalog DataFrame
+
+        Returns:
+            CSV content as bytes
+        """
+        sink = pa.BufferOutputStream()
+        CatalogGenerator.write_catalog(df, sink)
+        return sink.getvalue().to_pybytes()
 
     def _load_or_create_catalog(self, catalog_path: str) -> pd.DataFrame:
         """
@@ -77,28 +222,141 @@ class CatalogGenerator:
         Returns:
             DataFrame with catalog data or empty DataFrame with headers
         """
-        catalog_file = Path(catalog_path)
-
-        if catalog_file.exists():
-            try:
-                df = pd.read_csv(catalog_path)
-                logger.info(f"Loaded existing catalog with {len(df)} rows")
-                return df
-            except Exception as e:
-                logger.warning(f"Error loading catalog, creating new: {e}")
+        # Open directly instead of checking exists() first (one stat fewer);
+        # all columns are read with a fixed text schema, no type inference
+        try:
+            df = self.read_catalog(catalog_path)
+            logger.info(f"Loaded existing catalog with {len(df)} rows")
+            return df
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Error loading catalog, creating new: {e}")
 
         # Create new DataFrame with correct columns
         logger.info("Creating new catalog")
         return pd.DataFrame(columns=self.columns)
 
+    def _read_catalog_index(self, catalog_path: str) -> Tuple[List[str], Dict[str, str], bool]:
+        """
+        Stream the catalog CSV and collect its header and batch prices by ID.
+
+        Args:
+            catalog_path: Path to catalog CSV file
+
+        Returns:
+            Tuple of (header columns, {batch ID: price} with the last row
+            winning, whether any batch ID appears in more than one row);
+            header and index are empty if the catalog doesn't exist or has
+            no header
+        """
+        if not Path(catalog_path).exists():
+            return [], {}, False
+
+        # Reuse the index from the last read/write if the file is unchanged
+        # (only duplicate-free catalogs are cached)
+        cached = _catalog_index.get(str(catalog_path))
+        if cached and cached[0] == self._file_signature(catalog_path):
+            return list(cached[1]), dict(cached[2]), False
+
+        with open(catalog_path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            if 'id' not in header:
+                return header, {}, False
+
+            id_index = header.index('id')
+            price_index = header.index('price') if 'price' in header else None
+            index = {}
+            row_count = 0
+            for row in reader:
+                if len(row) > id_index:
+                    row_count += 1
+                    index[row[id_index]] = row[price_index] if price_index is not None and len(row) > price_index else ''
+
+        if row_count != len(index):
+            return header, index, True
+
+        self._remember_index(catalog_path, header, index)
+        return header, index, False
+
+    def _remember_index(self, catalog_path: str, header: List[str], index: Dict[str, str]) -> None:
+        """
+        Cache the header and batch prices of the catalog as currently on disk.
+
+        Args:
+            catalog_path: Path to catalog CSV file
+            header: Catalog header columns
+            index: {batch ID: price} for the catalog
+        """
+        _catalog_index[str(catalog_path)] = (
+            self._file_signature(catalog_path), list(header), dict(index)
+        )
+
+    def _index_stats(self, index: Dict[str, str]) -> dict:
+        """
+        Build catalog statistics from a {batch ID: price} index.
+
+        Args:
+            index: {batch ID: price} for the catalog
+
+        Returns:
+            Dictionary with catalog statistics (same keys as get_catalog_stats)
+        """
+        return {
+            'total_batches': len(index),
+            'total_value': float(self.parse_prices(pd.Series(list(index.values()), dtype=object)).sum()),
+            'exists': True,
+            'batch_ids': list(index)
+        }
+
+    @staticmethod
+    def _file_signature(catalog_path: str) -> Tuple[int, int]:
+        """Modification time and size, used to detect catalog rewrites."""
+        stat = Path(catalog_path).stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def _append_rows(self, rows: List[list], catalog_path: str, header: List[str]) -> None:
+        """
+        Append rows to the catalog CSV, writing the header for a new file.
+
+        Args:
+            rows: Row values in self.columns order
+            catalog_path: Path to catalog CSV file
+            header: Existing header (empty if the catalog is new)
+        """
+        if header and header != self.columns:
+            # Existing file with a different column layout - map by name
+            positions = {column: i for i, column in enumerate(self.columns)}
+            rows = [
+                [row[positions[column]] if column in positions else '' for column in header]
+                for row in rows
+            ]
+
+        # Don't glue the first new row onto a last line with no newline
+        needs_newline = False
+        if header:
+            with open(catalog_path, 'rb') as f:
+                f.seek(-1, 2)
+                needs_newline = f.read(1) not in (b'\n', b'\r')
+
+        with open(catalog_path, 'a', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER_SIZE) as f:
+            if needs_newline:
+                f.write('\n')
+            # Quote every field, like PyArrow does in write_catalog
+            writer = csv.writer(f, lineterminator='\n', quoting=csv.QUOTE_ALL)
+            if not header:
+                writer.writerow(self.columns)
+            writer.writerows(rows)
+
     def _create_batch_row(
         self,
         batch: LiquidationBatch,
         pdf_url: str,
         markup_percentage: float = 0.0
-    ) -> dict:
+    ) -> list:
         """
-        Create a single row dictionary for the batch.
+        Create a single catalog row for the batch.
 
         Args:
             batch: LiquidationBatch object
@@ -106,7 +364,7 @@ class CatalogGenerator:
             markup_percentage: Markup percentage to add to price (e.g., 25.0 for 25%)
 
         Returns:
-            Dictionary with row data matching CSV columns
+            Row values in Config.CSV_COLUMNS order
         """
         summary = batch.summary
 
@@ -114,7 +372,7 @@ class CatalogGenerator:
         # Note: batch.apply_markup() should be called BEFORE generating CSV
         final_price = int(summary.total_client_cost)
 
-        # Extract images (first 10 items)
+        # Extract images (first 10 items with an image)
         image_links = self._extract_images(batch, max_images=10)
         primary_image = image_links[0] if image_links else ''
         additional_images = ','.join(image_links[1:]) if len(image_links) > 1 else ''
@@ -131,23 +389,23 @@ class CatalogGenerator:
         # Create description
         description = self._create_description(batch)
 
-        # Build row data
-        row = {
-            'id': summary.lot_number,
-            'title': title,
-            'description': description,
-            'availability': 'in stock',
-            'condition': 'New',
-            'price': f"{final_price:,d} USD",
-            'link': pdf_url,
-            'image_link': primary_image,
-            'brand': brand,
-            'google_product_category': google_category,
-            'item_group_id': '',
-            'shipping_weight': '',
-            'video[0].url': '',
-            'additional_image_link': additional_images
-        }
+        # Build row data (same order as Config.CSV_COLUMNS)
+        row = [
+            summary.lot_number,          # id
+            title,                       # title
+            description,                 # description
+            'in stock',                  # availability
+            'New',                       # condition
+            f"{final_price:,d} USD",     # price
+            pdf_url,                     # link
+            primary_image,               # image_link
+            brand,                       # brand
+            google_category,             # google_product_category
+            '',                          # item_group_id
+            '',                          # shipping_weight
+            '',                          # video[0].url
+            additional_images            # additional_image_link
+        ]
 
         return row
 
@@ -160,13 +418,11 @@ class CatalogGenerator:
             max_images: Maximum number of images to extract
 
         Returns:
-            List of image URLs
+            List of up to max_images image URLs, in item order
         """
-        images = []
-
-        for item in batch.items[:max_images]:
-            if item.image_url and item.image_url.strip():
-                images.append(item.image_url)
+        # Lazily filter blank URLs and stop once enough are found
+        image_urls = (item.image_url for item in batch.items)
+        images = list(islice((url for url in image_urls if url and url.strip()), max_images))
 
         logger.info(f"Extracted {len(images)} images from batch")
         return images
@@ -181,14 +437,16 @@ class CatalogGenerator:
         Returns:
             Most common vendor name or 'Mixed Brands'
         """
-        vendors = [item.vendor_name for item in batch.items if item.vendor_name]
+        vendor_counts = {}
+        for item in batch.items:
+            if item.vendor_name:
+                vendor_counts[item.vendor_name] = vendor_counts.get(item.vendor_name, 0) + 1
 
-        if not vendors:
+        if not vendor_counts:
             return 'Mixed Brands'
 
-        # Get most common vendor
-        vendor_counts = Counter(vendors)
-        most_common = vendor_counts.most_common(1)[0][0]
+        # Get most common vendor (ties go to the first seen, like Counter)
+        most_common = max(vendor_counts, key=vendor_counts.get)
 
         # Clean up vendor name (take first part before '/')
         brand = most_common.split('/')[0].strip()
@@ -255,17 +513,17 @@ class CatalogGenerator:
             raise FileNotFoundError(f"Catalog file not found: {catalog_path}")
 
         # Load catalog
-        df = pd.read_csv(catalog_path)
+        df = self.read_catalog(catalog_path)
         original_count = len(df)
 
-        # Filter out batches to delete
-        df = df[~df['id'].isin(batch_ids)]
+        # Filter out batches to delete (ids are read as text)
+        df = df[~df['id'].isin({str(batch_id) for batch_id in batch_ids})]
         new_count = len(df)
 
         deleted_count = original_count - new_count
 
         # Save updated catalog
-        df.to_csv(catalog_path, index=False)
+        self.write_catalog(df, catalog_path)
         logger.info(f"Deleted {deleted_count} batch(es) from catalog")
 
         return catalog_path
@@ -289,14 +547,14 @@ class CatalogGenerator:
                 'exists': False
             }
 
-        df = pd.read_csv(catalog_path)
+        df = self.read_catalog(catalog_path)
 
-        # Parse prices (remove " USD" and convert to float)
-        prices = df['price'].str.replace(' USD', '').astype(float)
+        # Parse prices (strip the " USD" suffix and thousands separators)
+        prices = self.parse_prices(df['price'])
 
         stats = {
             'total_batches': len(df),
-            'total_value': prices.sum(),
+            'total_value': float(prices.sum()),
             'exists': True,
             'batch_ids': df['id'].tolist()
         }
@@ -5,14 +5,39 @@ This module defines the data structures for processing liquidation batch files
 from Excel spreadsheets into standardized formats for PDF reports and CSV catalogs.
 """
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+from operator import itemgetter
 import pandas as pd
+import heapq
 import math
-
-
-@dataclass
+import os
+
+
+# Item field -> (Excel column header, default for blank cells)
+ITEM_COLUMNS = {
+    'upc': ('UPC', ''),
+    'description': ('ITEM DESCRIPTION', ''),
+    'original_qty': ('ORIGINAL QTY', 0),
+    'original_cost': ('ORIGINAL COST', 0),
+    'total_original_cost': ('TOTAL ORIGINAL COST', 0),
+    'original_retail': ('ORIGINAL RETAIL', 0),
+    'total_original_retail': ('TOTAL ORIGINAL RETAIL', 0),
+    'vendor_style': ('VENDOR / STYLE #', ''),
+    'color': ('COLOR', ''),
+    'size': ('SIZE', ''),
+    'client_cost': ('CLIENT COST', 0),
+    'total_client_cost': ('TOTAL CLIENT COST', 0),
+    'division': ('DIVISION', ''),
+    'department_name': ('DEPARTMENT NAME', ''),
+    'vendor_name': ('VENDOR NAME', ''),
+    'image_url': ('IMAGE', ''),
+}
+
+
+@dataclass(slots=True)
 class BatchSummary:
     """Summary information for a liquidation batch"""
     location: str
@@ -74,7 +99,7 @@ class BatchSummary:
         return self.chargeable_weight_kg * self.SHIPPING_RATE_PER_KG
 
 
-@dataclass
+@dataclass(slots=True)
 class Item:
     """Individual item in a liquidation batch"""
     upc: str
@@ -93,6 +118,7 @@ class Item:
     department_name: str = ""
     vendor_name: str = ""
     image_url: str = ""
+    thumbnail_url: str = ""  # small JPEG copy on S3, set when images are uploaded
 
     @property
     def profit_margin(self) -> float:
@@ -109,7 +135,7 @@ class Item:
         return 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class LiquidationBatch:
     """Complete liquidation batch containing summary and items"""
     summary: BatchSummary
@@ -135,20 +161,34 @@ class LiquidationBatch:
     @property
     def top_vendors(self) -> Dict[str, int]:
         """Count items by vendor"""
-        vendors = {}
-        for item in self.items:
-            vendor = item.vendor_name or "Unknown"
-            vendors[vendor] = vendors.get(vendor, 0) + 1
-        return dict(sorted(vendors.items(), key=lambda x: x[1], reverse=True))
+        vendors, _ = self.count_distributions()
+        return self.top_counts(vendors)
 
     @property
     def size_distribution(self) -> Dict[str, int]:
         """Count items by size"""
+        _, sizes = self.count_distributions()
+        return self.top_counts(sizes)
+
+    def count_distributions(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Count items by vendor and by size in a single pass (unsorted)"""
+        vendors = {}
         sizes = {}
         for item in self.items:
+            vendor = item.vendor_name or "Unknown"
+            vendors[vendor] = vendors.get(vendor, 0) + 1
             size = item.size or "Unknown"
             sizes[size] = sizes.get(size, 0) + 1
-        return dict(sorted(sizes.items(), key=lambda x: x[1], reverse=True))
+        return vendors, sizes
+
+    @staticmethod
+    def top_counts(counts: Dict[str, int], k: Optional[int] = None) -> Dict[str, int]:
+        """Order counts from highest to lowest, keeping only the top k if given"""
+        if k is None:
+            ranked = sorted(counts.items(), key=itemgetter(1), reverse=True)
+        else:
+            ranked = heapq.nlargest(k, counts.items(), key=itemgetter(1))
+        return dict(ranked)
 
     def apply_markup(self, markup_percentage: float) -> None:
         """
@@ -158,33 +198,48 @@ class LiquidationBatch:
         Args:
             markup_percentage: Markup percentage (e.g., 25.0 for 25%)
         """
+        factor = 1 + markup_percentage / 100.0
+        ceil = math.ceil
+        total = 0.0
+
         for item in self.items:
             # Apply markup and round UP to nearest integer
-            new_client_cost = math.ceil(item.client_cost * (1 + markup_percentage / 100.0))
-            item.client_cost = float(new_client_cost)
+            item.client_cost = float(ceil(item.client_cost * factor))
 
             # Update total client cost for this item
             item.total_client_cost = item.client_cost * item.original_qty
+            total += item.total_client_cost
 
         # Update batch summary total to match sum of items
-        self.summary.total_client_cost = sum(item.total_client_cost for item in self.items)
+        self.summary.total_client_cost = total
+
+
+@dataclass(slots=True)
+class ParsedBatch:
+    """A parsed upload awaiting review (kept in session state)"""
+    batch: LiquidationBatch
+    tmp_path: str
+    file_name: str
 
 
 class BatchProcessor:
     """Process liquidation batch Excel files into structured data"""
 
     @staticmethod
-    def parse_excel_file(file_path: str) -> LiquidationBatch:
+    def parse_excel_file(file_path: str, processed_date: Optional[datetime] = None) -> LiquidationBatch:
         """
         Parse an Excel file into a LiquidationBatch object
 
         Args:
             file_path: Path to the Excel file
+            processed_date: Timestamp for the batch (defaults to now); pass one
+                            shared value when parsing a run of files
 
         Returns:
             LiquidationBatch object with parsed data
         """
-        df_raw = pd.read_excel(file_path, header=None)
+        # Rust-backed calamine reader is much faster than openpyxl for .xlsx
+        df_raw = pd.read_excel(file_path, header=None, engine='calamine')
 
         # Parse batch summary (row 1 = headers, row 2 = data)
         batch_data = BatchProcessor._parse_batch_summary(df_raw)
@@ -219,11 +274,48 @@ class BatchProcessor:
             total_client_cost=float(batch_data.get('TOTAL CLIENT COST', 0)),
             avg_unit_client_cost=batch_data.get('AVG. UNIT CLIENT COST'),
             total_weight_lbs=weight_lbs,
+            processed_date=processed_date or datetime.now(),
             source_file=file_path
         )
 
         return LiquidationBatch(summary=summary, items=items)
 
+    @staticmethod
+    def parse_many(
+        file_paths: List[str],
+        processed_date: Optional[datetime] = None
+    ) -> List[Optional[LiquidationBatch]]:
+        """
+        Parse several Excel files in parallel worker processes
+
+        Parsing is CPU bound (Excel decoding, DataFrame construction), so
+        processes are used rather than threads to sidestep the GIL.
+
+        Args:
+            file_paths: Paths to the Excel files
+            processed_date: Timestamp shared by all batches (defaults to now)
+
+        Returns:
+            LiquidationBatch per path, in order (None for files that failed)
+        """
+        processed_date = processed_date or datetime.now()
+
+        with ProcessPoolExecutor(max_workers=min(len(file_paths), os.cpu_count() or 1) or None) as executor:
+            futures = [
+                executor.submit(BatchProcessor.parse_excel_file, path, processed_date)
+                for path in file_paths
+            ]
+
+            batches = []
+            for path, future in zip(file_paths, futures):
+                try:
+                    batches.append(future.result())
+                except Exception as e:
+                    print(f"Warning: Could not parse {path}: {e}")
+                    batches.append(None)
+
+        return batches
+
     @staticmethod
     def _parse_batch_summary(df_raw: pd.DataFrame) -> Dict[str, Any]:
         """Parse the batch summary section"""
@@ -245,51 +337,52 @@ class BatchProcessor:
         items = []
 
         # Row 8 contains item headers
-        item_headers = []
-        for j in range(len(df_raw.columns)):
-            val = df_raw.iloc[8, j]
-            if pd.notna(val):
-                item_headers.append(str(val))
-            else:
-                item_headers.append(f'column_{j}')
-
-        # Parse items starting from row 9
-        for i in range(9, len(df_raw)):
-            row_data = {}
-            has_data = False
-
-            for j, header in enumerate(item_headers):
-                val = df_raw.iloc[i, j]
-                if pd.notna(val):
-                    row_data[header] = val
-                    has_data = True
-
-            # Only process rows with UPC (actual items)
-            if has_data and 'UPC' in row_data and row_data['UPC']:
-                try:
-                    item = Item(
-                        upc=str(row_data.get('UPC', '')),
-                        description=str(row_data.get('ITEM DESCRIPTION', '')),
-                        original_qty=int(row_data.get('ORIGINAL QTY', 0)),
-                        original_cost=float(row_data.get('ORIGINAL COST', 0)),
-                        total_original_cost=float(row_data.get('TOTAL ORIGINAL COST', 0)),
-                        original_retail=float(row_data.get('ORIGINAL RETAIL', 0)),
-                        total_original_retail=float(row_data.get('TOTAL ORIGINAL RETAIL', 0)),
-                        vendor_style=str(row_data.get('VENDOR / STYLE #', '')),
-                        color=str(row_data.get('COLOR', '')),
-                        size=str(row_data.get('SIZE', '')),
-                        client_cost=float(row_data.get('CLIENT COST', 0)),
-                        total_client_cost=float(row_data.get('TOTAL CLIENT COST', 0)),
-                        division=str(row_data.get('DIVISION', '')),
-                        department_name=str(row_data.get('DEPARTMENT NAME', '')),
-                        vendor_name=str(row_data.get('VENDOR NAME', '')),
-                        image_url=str(row_data.get('IMAGE', ''))
-                    )
-                    items.append(item)
-                except (ValueError, TypeError) as e:
-                    # Skip rows with invalid data
-                    print(f"Warning: Skipping row {i} due to data error: {e}")
-                    continue
+        item_headers = [
+            str(val) if pd.notna(val) else f'column_{j}'
+            for j, val in enumerate(df_raw.iloc[8])
+        ]
+
+        # Rows 9+ contain items (a repeated header keeps its last column)
+        items_df = df_raw.iloc[9:].set_axis(item_headers, axis=1)
+        items_df = items_df.loc[:, ~items_df.columns.duplicated(keep='last')]
+        if 'UPC' not in items_df.columns:
+            return items
+
+        # Only process rows with UPC (actual items)
+        upc = items_df['UPC']
+        items_df = items_df[upc.notna() & upc.astype(bool)]
+
+        # Select the item fields in one pass; blank cells take the defaults
+        columns = [column for column, _ in ITEM_COLUMNS.values()]
+        defaults = {column: default for column, default in ITEM_COLUMNS.values()}
+        items_df = items_df.reindex(columns=columns).fillna(defaults)
+
+        for i, *values in items_df.itertuples(name=None):
+            row = dict(zip(ITEM_COLUMNS, values))
+            try:
+                item = Item(
+                    upc=str(row['upc']),
+                    description=str(row['description']),
+                    original_qty=int(row['original_qty']),
+                    original_cost=float(row['original_cost']),
+                    total_original_cost=float(row['total_original_cost']),
+                    original_retail=float(row['original_retail']),
+                    total_original_retail=float(row['total_original_retail']),
+                    vendor_style=str(row['vendor_style']),
+                    color=str(row['color']),
+                    size=str(row['size']),
+                    client_cost=float(row['client_cost']),
+                    total_client_cost=float(row['total_client_cost']),
+                    division=str(row['division']),
+                    department_name=str(row['department_name']),
+                    vendor_name=str(row['vendor_name']),
+                    image_url=str(row['image_url'])
+                )
+                items.append(item)
+            except (ValueError, TypeError) as e:
+                # Skip rows with invalid data
+                print(f"Warning: Skipping row {i} due to data error: {e}")
+                continue
 
         return items
 
@@ -311,12 +404,14 @@ if __name__ == "__main__":
     print(f"Total Items Parsed: {batch.total_items}")
     print(f"Average Item Cost: ${batch.avg_item_cost:.2f}")
 
+    vendors, sizes = batch.count_distributions()
+
     print("\nTop Vendors:")
-    for vendor, count in list(batch.top_vendors.items())[:5]:
+    for vendor, count in batch.top_counts(vendors, 5).items():
         print(f"  {vendor}: {count} items")
 
     print("\nSize Distribution:")
-    for size, count in list(batch.size_distribution.items())[:5]:
+    for size, count in batch.top_counts(sizes, 5).items():
         print(f"  {size}: {count} items")
 
     print("\nSample Items:")
@@ -0,0 +1,210 @@
+"""
+Shared HTTP session for Liquidation Blitz application.
+Pools keep-alive connections for image and catalog downloads and keeps
+an on-disk cache of downloaded images.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+
+# (connect, read) timeouts for image downloads
+IMAGE_TIMEOUT = (3, 10)
+
+# Downloaded images, reused across runs (regenerating a batch's PDF)
+IMAGE_CACHE_DIR = Config.TEMP_DIR / 'img_cache'
+
+# Cache bounds: least recently used entries are evicted past the size cap,
+# and entries unused for longer than the max age are dropped
+IMAGE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+IMAGE_CACHE_MAX_AGE = 30 * 24 * 3600  # seconds
+
+# Cache writes between pruning passes (pruning lists the whole directory)
+IMAGE_CACHE_PRUNE_INTERVAL = 100
+
+_prune_lock = threading.Lock()
+_writes_since_prune = IMAGE_CACHE_PRUNE_INTERVAL  # prune on first write
+
+
+def _create_session() -> requests.Session:
+    """
+    Create a requests session with pooled, retrying connections.
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+
+    # Transient failures (connection errors, throttling, 5xx) are retried
+    # with backoff; the final response is returned so callers can inspect it
+    retries = Retry(
+        total=2,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+# Module-level session: reuses TCP/TLS connections across calls and threads
+SESSION = _create_session()
+
+
+def fetch_image(url: str) -> Tuple[bytes, str]:
+    """
+    Download an image through the on-disk cache.
+
+    Only image responses that carry an ETag or Last-Modified validator are
+    cached. A cached copy is always revalidated with a conditional GET
+    (If-None-Match / If-Modified-Since). If revalidation fails on the
+    network (connection error, timeout or 5xx) the cached copy is used; a
+    404 or 410 drops the cache entry.
+
+    Args:
+        url: Image URL
+
+    Returns:
+        Tuple of (image bytes, content type)
+
+    Raises:
+        requests.exceptions.RequestException: If the download fails and
+            there is no usable cached copy
+    """
+    # blake2b is fast and more than unique enough for a cache key
+    key = hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+    body_path = IMAGE_CACHE_DIR / f"{key}.bin"
+    meta_path = IMAGE_CACHE_DIR / f"{key}.json"
+
+    try:
+        meta = json.loads(meta_path.read_text())
+        if time.time() - body_path.stat().st_mtime > IMAGE_CACHE_MAX_AGE:
+            raise FileNotFoundError(body_path)
+        cached = body_path.read_bytes()
+    except (OSError, ValueError):
+        meta, cached = None, None
+
+    headers = {}
+    if cached is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        if not headers:
+            cached = None  # can't be revalidated - download again
+
+    try:
+        response = SESSION.get(url, headers=headers, timeout=IMAGE_TIMEOUT)
+        if cached is not None and response.status_code == 304:
+            _touch(body_path)  # recently used entries survive eviction
+            return cached, meta['content_type']
+        response.raise_for_status()
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+        if cached is not None:
+            return cached, meta['content_type']
+        raise
+    except requests.exceptions.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        if cached is not None and status is not None and status >= 500:
+            return cached, meta['content_type']
+        if status in (404, 410):
+            # The image is gone - don't keep serving it from the cache
+            body_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+        raise
+
+    content_type = response.headers.get('Content-Type', 'image/jpeg')
+    meta = {
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'content_type': content_type,
+    }
+
+    # Don't cache error pages served with 200, or bodies that can never be
+    # revalidated
+    is_image = response.headers.get('Content-Type', '').lower().startswith('image/')
+    if is_image and (meta['etag'] or meta['last_modified']):
+        try:
+            _write_atomic(body_path, response.content)
+            _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+            _maybe_prune_cache()
+        except OSError:
+            pass  # caching is best effort
+
+    return response.content, content_type
+
+
+def _touch(path):
+    """Mark a cache entry as used (mtime drives eviction order and age)"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _maybe_prune_cache():
+    """Run prune_image_cache() every IMAGE_CACHE_PRUNE_INTERVAL cache writes"""
+    global _writes_since_prune
+    with _prune_lock:
+        _writes_since_prune += 1
+        if _writes_since_prune < IMAGE_CACHE_PRUNE_INTERVAL:
+            return
+        _writes_since_prune = 0
+        prune_image_cache()
+
+
+def prune_image_cache():
+    """
+    Evict image cache entries that are too old or over the size cap.
+
+    Entries unused for longer than IMAGE_CACHE_MAX_AGE are removed, then the
+    least recently used ones until the cache fits IMAGE_CACHE_MAX_BYTES.
+    """
+    now = time.time()
+    entries = []
+    for body_path in IMAGE_CACHE_DIR.glob('*.bin'):
+        try:
+            stat = body_path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, body_path))
+
+    # Oldest first
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, body_path in entries:
+        if now - mtime <= IMAGE_CACHE_MAX_AGE and total <= IMAGE_CACHE_MAX_BYTES:
+            break
+        for path in (body_path, body_path.with_suffix('.json')):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        total -= size
+
+
+def _write_atomic(path, data: bytes):
+    """Write a file via a temp file + rename so readers never see partial data"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,46 @@
+"""
+Image helpers for Liquidation Blitz application.
+Shrinks item images to small JPEG thumbnails for S3 and the PDF catalog.
+"""
+
+from io import BytesIO
+from typing import Tuple
+
+from PIL import Image as PILImage
+
+
+def make_thumbnail(image_data: bytes, max_size: Tuple[int, int], quality: int = 80) -> Tuple[bytes, int, int]:
+    """
+    Resize an image to fit within max_size and re-encode it as JPEG.
+
+    Args:
+        image_data: Encoded source image (any format Pillow reads)
+        max_size: (width, height) bounding box; aspect ratio is kept
+        quality: JPEG quality
+
+    Returns:
+        Tuple of (JPEG bytes, width, height)
+
+    Raises:
+        PIL.UnidentifiedImageError: If the data is not a readable image
+    """
+    pil_image = PILImage.open(BytesIO(image_data))
+
+    # Let the JPEG decoder downscale while decoding (no-op for other formats)
+    pil_image.draft('RGB', (max_size[0] * 2, max_size[1] * 2))
+
+    # Resize to fit (maintain aspect ratio)
+    pil_image.thumbnail(max_size, PILImage.Resampling.BILINEAR)
+
+    # JPEG has no alpha - flatten transparent images onto white
+    if pil_image.mode in ('RGBA', 'LA') or (pil_image.mode == 'P' and 'transparency' in pil_image.info):
+        rgba = pil_image.convert('RGBA')
+        pil_image = PILImage.new('RGB', rgba.size, 'white')
+        pil_image.paste(rgba, mask=rgba.getchannel('A'))
+    elif pil_image.mode != 'RGB':
+        pil_image = pil_image.convert('RGB')
+
+    img_buffer = BytesIO()
+    pil_image.save(img_buffer, format='JPEG', quality=quality)
+
+    return img_buffer.getvalue(), pil_image.width, pil_image.height
@@ -5,8 +5,11 @@ Handles the complete workflow from Excel upload to S3 catalog generation.
 
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from io import BytesIO
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, List, Tuple
 
 from data_structure import BatchProcessor
 from pdf_generator import PDFGenerator
@@ -21,6 +24,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Batches published concurrently by process_batches (network bound; their
+# image work shares the fixed-size pools in s3_manager and pdf_generator)
+MAX_PUBLISH_WORKERS = 16
+
 
 class LiquidationBlitzApp:
     """Main application orchestrator."""
@@ -82,28 +89,8 @@ class LiquidationBlitzApp:
         logger.info(f"  - Units: {batch.summary.total_units}")
         logger.info(f"  - Value: ${batch.summary.total_client_cost:,.2f}")
 
-        # Step 2: Upload images to S3
-        logger.info("\n[2/8] Uploading images to S3...")
-        image_urls = [item.image_url for item in batch.items if item.image_url]
-        logger.info(f"  - Found {len(image_urls)} images to upload")
-        s3_image_urls = self.s3_manager.upload_images_batch(image_urls, batch.summary.lot_number)
-
-        # Update batch items with S3 image URLs
-        for idx, item in enumerate(batch.items):
-            if idx < len(s3_image_urls) and s3_image_urls[idx]:
-                item.image_url = s3_image_urls[idx]
-        logger.info(f"✓ Images uploaded to S3")
-
-        # Step 3: Generate PDF report
-        logger.info("\n[3/8] Generating PDF report...")
-        pdf_path = str(Config.OUTPUT_DIR / f"batch_{batch.summary.lot_number}.pdf")
-        self.pdf_generator.generate_report(batch, pdf_path)
-        logger.info(f"✓ PDF generated: {pdf_path}")
-
-        # Step 4: Upload PDF to S3
-        logger.info("\n[4/8] Uploading PDF to S3...")
-        pdf_url = self.s3_manager.upload_pdf_to_s3(pdf_path, batch.summary.lot_number)
-        logger.info(f"✓ PDF uploaded: {pdf_url}")
+        # Steps 2-4: Upload images, generate PDF report, upload PDF
+        pdf_url = self._publish_batch(batch)
 
         # Step 5: Download existing catalog from S3
         logger.info("\n[5/8] Downloading catalog from S3...")
@@ -113,13 +100,12 @@ class LiquidationBlitzApp:
 
         # Step 6: Update catalog with new batch
         logger.info("\n[6/8] Updating catalog...")
-        updated_catalog_path = self.catalog_generator.update_catalog(
+        updated_catalog_path, stats = self.catalog_generator.update_catalog(
             batch, pdf_url, catalog_path
         )
         logger.info(f"✓ Catalog updated")
 
-        # Get catalog stats
-        stats = self.catalog_generator.get_catalog_stats(updated_catalog_path)
+        # Catalog stats (computed while updating, no re-read)
         logger.info(f"  - Total batches in catalog: {stats['total_batches']}")
         logger.info(f"  - Total catalog value: ${stats['total_value']:,.2f}")
 
@@ -138,6 +124,121 @@ class LiquidationBlitzApp:
 
         return pdf_url, catalog_url
 
+    def process_batches(self, excel_paths: List[str]) -> Tuple[Dict[str, str], str]:
+        """
+        Process several liquidation batches with a single catalog update.
+
+        Excel files are parsed in worker processes (CPU bound) and published
+        (images, PDF) concurrently in threads (network bound). The catalog is
+        then downloaded, updated with every batch and uploaded once.
+
+        Args:
+            excel_paths: Paths to Excel files
+
+        Returns:
+            Tuple of ({excel_path: pdf_url}, catalog_url); files that fail to
+            parse or publish are logged and left out
+
+        Raises:
+            FileNotFoundError: If an Excel file doesn't exist
+            ValueError: If configuration is invalid
+            Exception: For catalog processing errors
+        """
+        logger.info("=" * 80)
+        logger.info(f"LIQUIDATION BLITZ - PROCESSING {len(excel_paths)} BATCHES")
+        logger.info("=" * 80)
+
+        # Validate configuration
+        try:
+            Config.validate()
+        except ValueError as e:
+            logger.error(f"Configuration error: {e}")
+            raise
+
+        for excel_path in excel_paths:
+            if not Path(excel_path).exists():
+                raise FileNotFoundError(f"Excel file not found: {excel_path}")
+
+        # Phase 1: Parse Excel files in parallel processes
+        logger.info("\n[1/3] Parsing Excel files...")
+        batches = {}
+        processed_date = datetime.now()  # one timestamp for the whole run
+        parsed = BatchProcessor.parse_many(excel_paths, processed_date)
+        for path, batch in zip(excel_paths, parsed):
+            if batch is None:
+                logger.error(f"Failed to parse {path}")
+                continue
+            batches[path] = batch
+            logger.info(f"✓ Parsed batch #{batch.summary.lot_number} ({Path(path).name})")
+
+        # Phase 2: Upload images, generate and upload PDFs concurrently
+        logger.info("\n[2/3] Publishing batches...")
+        pdf_urls = {}
+        with ThreadPoolExecutor(max_workers=MAX_PUBLISH_WORKERS) as executor:
+            futures = {
+                path: executor.submit(self._publish_batch, batch)
+                for path, batch in batches.items()
+            }
+            for path, future in futures.items():
+                try:
+                    pdf_urls[path] = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to publish {path}: {e}")
+
+        # Phase 3: One catalog download, update and upload for all batches
+        logger.info("\n[3/3] Updating catalog...")
+        catalog_path = str(Config.TEMP_DIR / Config.CATALOG_FILENAME)
+        self.s3_manager.download_catalog_from_s3(catalog_path)
+        for path, pdf_url in pdf_urls.items():
+            self.catalog_generator.stage_batch(batches[path], pdf_url)
+        _, stats = self.catalog_generator.commit(catalog_path)
+        logger.info(f"  - Total batches in catalog: {stats['total_batches']}")
+        logger.info(f"  - Total catalog value: ${stats['total_value']:,.2f}")
+        catalog_url = self.s3_manager.upload_catalog_to_s3(catalog_path)
+        logger.info(f"✓ Catalog uploaded with {len(pdf_urls)} new batch(es): {catalog_url}")
+
+        return pdf_urls, catalog_url
+
+    def _publish_batch(self, batch) -> str:
+        """
+        Upload batch images to S3, generate the PDF report and upload it.
+
+        Args:
+            batch: Parsed LiquidationBatch (item image URLs are replaced
+                   with their S3 copies)
+
+        Returns:
+            Public URL to the uploaded PDF
+        """
+        lot_number = batch.summary.lot_number
+
+        # Step 2: Upload images to S3
+        logger.info(f"\n[2/8] Uploading images to S3 for batch #{lot_number}...")
+        image_urls = [item.image_url for item in batch.items]
+        logger.info(f"  - Found {sum(1 for url in image_urls if url)} images to upload")
+        s3_image_urls = self.s3_manager.upload_images_batch(image_urls, lot_number)
+
+        # Update batch items with S3 image and thumbnail URLs (one entry per item)
+        for item, (image_url, thumbnail_url) in zip(batch.items, s3_image_urls):
+            if image_url:
+                item.image_url = image_url
+                item.thumbnail_url = thumbnail_url
+        logger.info(f"✓ Images uploaded to S3")
+
+        # Step 3: Generate PDF report (in memory, no local file round trip;
+        # item images come from the small S3 thumbnails)
+        logger.info(f"\n[3/8] Generating PDF report for batch #{lot_number}...")
+        pdf_buffer = BytesIO()
+        self.pdf_generator.generate_report(batch, pdf_buffer)
+        logger.info(f"✓ PDF generated ({pdf_buffer.tell() / 1024 / 1024:.1f} MB)")
+
+        # Step 4: Upload PDF to S3
+        logger.info(f"\n[4/8] Uploading PDF to S3 for batch #{lot_number}...")
+        pdf_url = self.s3_manager.upload_pdf_bytes_to_s3(pdf_buffer, lot_number)
+        logger.info(f"✓ PDF uploaded: {pdf_url}")
+
+        return pdf_url
+
     def test_s3_connection(self) -> bool:
         """
         Test S3 connection.
@@ -152,12 +253,12 @@ class LiquidationBlitzApp:
 def main():
     """Main entry point for command-line usage."""
     if len(sys.argv) < 2:
-        print("Usage: python main.py <excel_file_path>")
+        print("Usage: python main.py <excel_file_path> [<excel_file_path> ...]")
         print("\nExample:")
         print("  python main.py 16601678.xlsx")
         sys.exit(1)
 
-    excel_path = sys.argv[1]
+    excel_paths = sys.argv[1:]
 
     try:
         # Initialize app
@@ -168,17 +269,26 @@ def main():
             logger.error("S3 connection failed. Please check your configuration.")
             sys.exit(1)
 
-        # Process batch
-        pdf_url, catalog_url = app.process_batch(excel_path)
+        # Process batch(es)
+        if len(excel_paths) == 1:
+            pdf_url, catalog_url = app.process_batch(excel_paths[0])
+            pdf_urls = {excel_paths[0]: pdf_url}
+        else:
+            pdf_urls, catalog_url = app.process_batches(excel_paths)
 
         # Print results
         print("\n" + "=" * 80)
-        print("SUCCESS!")
+        print("SUCCESS!" if len(pdf_urls) == len(excel_paths) else
+              f"PROCESSED {len(pdf_urls)} OF {len(excel_paths)} BATCHES")
         print("=" * 80)
-        print(f"\nPDF URL:\n{pdf_url}")
+        for excel_path, pdf_url in pdf_urls.items():
+            print(f"\nPDF URL ({Path(excel_path).name}):\n{pdf_url}")
         print(f"\nCatalog URL:\n{catalog_url}")
         print("\n" + "=" * 80)
 
+        if len(pdf_urls) < len(excel_paths):
+            sys.exit(1)
+
     except FileNotFoundError as e:
         logger.error(f"File error: {e}")
         sys.exit(1)
@@ -13,17 +13,48 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.platypus import (
     SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-    PageBreak, Image, KeepTogether
+    PageBreak, Image
 )
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from reportlab.pdfgen import canvas
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Union, BinaryIO
 import os
-import requests
 from io import BytesIO
-from PIL import Image as PILImage
+from xml.sax.saxutils import escape
 from data_structure import LiquidationBatch, Item, BatchSummary
+from http_client import fetch_image
+from image_utils import make_thumbnail
+
+# Concurrent item image downloads/decodes, shared by every report being built
+# (reports for several batches may be generated at once)
+IMAGE_FETCH_WORKERS = 32
+_IMAGE_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=IMAGE_FETCH_WORKERS, thread_name_prefix='pdf-image')
+
+# Bounding box for item images in the catalog (2 inch roughly)
+CATALOG_IMAGE_SIZE = (200, 200)
+
+# Item details markup for the catalog pages, filled per item with %-formatting
+# (text fields must be XML-escaped for ReportLab's paragraph parser)
+ITEM_DETAILS_HTML = """
+        <font size="14" color="#1a1a1a"><b>%(description)s</b></font><br/>
+        <br/>
+        <font size="12" color="#1a1a1a">
+        <b>UPC:</b> %(upc)s<br/>
+        <b>Quantity:</b> <font color="#1565c0">%(qty)s</font><br/>
+        <b>Size:</b> %(size)s<br/>
+        <b>Color:</b> %(color)s<br/>
+        <br/>
+        <b>Original Retail:</b> <font color="#2e7d32">$%(retail)s</font> <font color="#666666">(each)</font><br/>
+        <br/>
+        <b>Vendor:</b> %(vendor)s<br/>
+        <b>Style #:</b> %(style)s
+        </font>
+        """
+
+# Missing-image placeholder text, formatted with the item's UPC
+PLACEHOLDER_HTML = "[Image Not Available]<br/>UPC: %s"
 
 
 class NumberedCanvas(canvas.Canvas):
@@ -63,6 +94,23 @@ class PDFGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self._item_detail_style = self.styles['ItemDetail']
+        self._placeholder_style = self.styles['ImagePlaceholder']
+
+        # Shared style for the per-page item tables (image left, details
+        # right, grey rule under each item); ranges use negative indexes
+        # so one instance fits any number of rows
+        self._item_table_style = TableStyle([
+            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 12),
+            ('TOPPADDING', (0, 0), (-1, 0), 0),
+            ('TOPPADDING', (0, 1), (-1, -1), 0.3*inch),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 0.35*inch),
+            ('LINEBELOW', (0, 0), (-1, -1), 1, colors.lightgrey),
+        ])
 
     def _setup_custom_styles(self):
         """Create custom paragraph styles with large, visible text"""
@@ -134,6 +182,15 @@ class PDFGenerator:
             fontName='Helvetica'
         ))
 
+        # Missing item image placeholder (centered grey text in the image cell)
+        self.styles.add(ParagraphStyle(
+            name='ImagePlaceholder',
+            parent=self.styles['ItemDetail'],
+            fontSize=10,
+            alignment=TA_CENTER,
+            textColor=colors.HexColor('#999999'),
+        ))
+
         # Item title
         self.styles.add(ParagraphStyle(
             name='ItemTitle',
@@ -145,10 +202,20 @@ class PDFGenerator:
             fontName='Helvetica-Bold'
         ))
 
-    def generate_report(self, batch: LiquidationBatch, output_path: str):
-        """Generate the custom PDF report"""
+    def generate_report(self, batch: LiquidationBatch, output: Union[str, BinaryIO]):
+        """
+        Generate the custom PDF report.
+
+        Args:
+            batch: Liquidation batch to render
+            output: File path, or a writable binary file object (e.g. BytesIO)
+                    to build the PDF in memory
+
+        Returns:
+            The output path or file object
+        """
         doc = SimpleDocTemplate(
-            output_path,
+            output,
             pagesize=letter,
             rightMargin=0.75*inch,
             leftMargin=0.75*inch,
@@ -159,20 +226,24 @@ class PDFGenerator:
 
         story = []
 
+        # One pass over the items for the totals and the catalog entries
+        client_cost, retail_value, item_details = self._preprocess_items(batch.items)
+
         # 1. Cover page with logo and contact
         story.extend(self._create_cover_page(batch.summary))
         story.append(PageBreak())
 
         # 2. Summary page with details and financial analysis
-        story.extend(self._create_summary_page(batch))
+        story.extend(self._create_summary_page(batch, client_cost, retail_value))
         story.append(PageBreak())
 
         # 3. Shipping information and total costs
-        story.extend(self._create_shipping_page(batch))
+        story.extend(self._create_shipping_page(batch, client_cost))
         story.append(PageBreak())
 
-        # 4. Item catalog with images
-        story.extend(self._create_image_catalog(batch.items))
+        # 4. Item catalog with images (downloaded up front, concurrently)
+        images = self._prefetch_images(batch.items)
+        story.extend(self._create_image_catalog(batch.items, images, item_details))
 
         # 5. Back page with QR code and contact
         story.append(PageBreak())
@@ -180,7 +251,7 @@ class PDFGenerator:
 
         # Build PDF
         doc.build(story)
-        return output_path
+        return output
 
     def _create_cover_page(self, summary: BatchSummary) -> List:
         """Create cover page with logo, title, lot number, and contact info"""
@@ -250,8 +321,8 @@ class PDFGenerator:
 
         return content
 
-    def _create_summary_page(self, batch: LiquidationBatch) -> List:
-        """Create summary page with details and financial analysis"""
+    def _create_summary_page(self, batch: LiquidationBatch, client_cost: float, retail_value: float) -> List:
+        """Create summary page with details and financial analysis (totals from _preprocess_items)"""
         content = []
 
         # Details section
@@ -288,10 +359,8 @@ class PDFGenerator:
         content.append(Paragraph("Financial Analysis", self.styles['SectionHeader']))
 
         # Calculate key metrics
-        original_cost = sum(item.total_original_cost for item in batch.items)
-        client_cost = sum(item.total_client_cost for item in batch.items)
-        retail_value = sum(item.total_original_retail for item in batch.items)
         discount_percent = ((retail_value - client_cost) / retail_value * 100)
+        avg_item_cost = client_cost / len(batch.items) if batch.items else 0.0
 
         financial_data = [
             ['Metric', 'Amount'],
@@ -299,7 +368,7 @@ class PDFGenerator:
             ['Total Original Retail', f"${int(retail_value):,d}"],
             ['Total Savings', f"${int(retail_value - client_cost):,d}"],
             ['Average Discount', f"{discount_percent:.1f}%"],
-            ['Average Item Cost', f"${int(batch.avg_item_cost):,d}"],
+            ['Average Item Cost', f"${int(avg_item_cost):,d}"],
             ['Unique Items', f"{batch.total_items:,}"],
         ]
 
@@ -334,7 +403,63 @@ class PDFGenerator:
 
         return content
 
-    def _create_image_catalog(self, items: List[Item]) -> List:
+    def _preprocess_items(self, items: List[Item]) -> Tuple[float, float, List[Paragraph]]:
+        """
+        Walk the items once, collecting everything the report needs from them.
+
+        Args:
+            items: Batch items
+
+        Returns:
+            Tuple of (total client cost, total original retail, item details
+            paragraphs in item order)
+        """
+        client_cost = 0.0
+        retail_value = 0.0
+        details = []
+        for item in items:
+            client_cost += item.total_client_cost
+            retail_value += item.total_original_retail
+            details.append(self._get_item_details(item))
+        return client_cost, retail_value, details
+
+    def _prefetch_images(self, items: List[Item]) -> Dict[str, Tuple[bytes, int, int]]:
+        """Download and thumbnail all item images concurrently, keyed by URL"""
+        # Each distinct URL is fetched once, however many items share it
+        # (repeated SKUs/colorways); value is the first UPC for messages
+        image_urls = {}
+        for item in items:
+            url = self._item_image_source(item)
+            if url and url.startswith('http'):
+                image_urls.setdefault(url, item.upc)
+        if not image_urls:
+            return {}
+
+        def fetch(url: str, upc: str):
+            try:
+                image_data, _ = fetch_image(url)
+                # Decoding/resizing in the worker too (Pillow releases the GIL)
+                return url, make_thumbnail(image_data, CATALOG_IMAGE_SIZE)
+            except Exception as e:
+                print(f"Could not load image for {upc}: {e}")
+            return url, None
+
+        # Shared bounded pool: thread count and decode memory stay capped however
+        # many batches are being rendered concurrently
+        results = _IMAGE_FETCH_EXECUTOR.map(fetch, image_urls.keys(), image_urls.values())
+        return {url: thumbnail for url, thumbnail in results if thumbnail is not None}
+
+    @staticmethod
+    def _item_image_source(item: Item) -> str:
+        """URL to render an item's image from (the small S3 thumbnail when uploaded)"""
+        return item.thumbnail_url or item.image_url
+
+    def _create_image_catalog(
+        self,
+        items: List[Item],
+        images: Dict[str, Tuple[bytes, int, int]],
+        details: List[Paragraph]
+    ) -> List:
         """Create item catalog with images on left, details on right (3-4 items per page)"""
         content = []
 
@@ -346,16 +471,18 @@ class PDFGenerator:
 
         for i in range(0, len(items), items_per_page):
             page_items = items[i:i + items_per_page]
+            page_details = details[i:i + items_per_page]
 
-            # Create items for this page
-            page_content = []
-
-            for item in page_items:
-                item_content = self._create_item_entry(item)
-                page_content.append(KeepTogether(item_content))
-                page_content.append(Spacer(1, 0.3*inch))
+            # One table per page: column widths and borders are laid out
+            # once for the page rather than once per item
+            rows = [
+                [self._get_item_image(item, images.get(self._item_image_source(item))), item_details]
+                for item, item_details in zip(page_items, page_details)
+            ]
+            page_table = Table(rows, colWidths=[2.5*inch, 4*inch], style=self._item_table_style)
 
-            content.extend(page_content)
+            content.append(page_table)
+            content.append(Spacer(1, 0.3*inch))
 
             # Add page break if there are more items
             if i + items_per_page < len(items):
@@ -363,99 +490,38 @@ class PDFGenerator:
 
         return content
 
-    def _create_item_entry(self, item: Item) -> List:
-        """Create a single item entry with image on left, details on right"""
-        content = []
-
-        # Create table with image and details
-        image_cell = self._get_item_image(item)
-        details_cell = self._get_item_details(item)
-
-        # Create two-column layout
-        item_table = Table(
-            [[image_cell, details_cell]],
-            colWidths=[2.5*inch, 4*inch]
-        )
-
-        item_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-            ('ALIGN', (1, 0), (1, 0), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 0),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 12),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-        ]))
-
-        content.append(item_table)
-
-        # Add a separator line
-        content.append(Spacer(1, 0.1*inch))
-        separator = Table([['']]*1, colWidths=[6.5*inch])
-        separator.setStyle(TableStyle([
-            ('LINEBELOW', (0, 0), (-1, -1), 1, colors.lightgrey),
-        ]))
-        content.append(separator)
-
-        return content
-
-    def _get_item_image(self, item: Item):
-        """Get item image or placeholder"""
+    def _get_item_image(self, item: Item, thumbnail: Optional[Tuple[bytes, int, int]] = None):
+        """Get item image (from a prefetched thumbnail) or placeholder"""
         try:
-            if item.image_url and item.image_url.startswith('http'):
-                # Download and resize image
-                response = requests.get(item.image_url, timeout=10)
-                if response.status_code == 200:
-                    image_data = BytesIO(response.content)
-                    pil_image = PILImage.open(image_data)
-
-                    # Resize to fit (maintain aspect ratio)
-                    max_size = (200, 200)  # 2 inch roughly
-                    pil_image.thumbnail(max_size, PILImage.Resampling.LANCZOS)
-
-                    # Save to BytesIO
-                    img_buffer = BytesIO()
-                    pil_image.save(img_buffer, format='PNG')
-                    img_buffer.seek(0)
-
-                    # Create ReportLab Image
-                    img = Image(img_buffer, width=pil_image.width, height=pil_image.height)
-                    return img
+            if thumbnail:
+                image_data, width, height = thumbnail
+
+                # Create ReportLab Image (identical image data is embedded
+                # once in the PDF and referenced from every page using it)
+                img = Image(BytesIO(image_data), width=width, height=height)
+                return img
         except Exception as e:
             print(f"Could not load image for {item.upc}: {e}")
 
-        # Placeholder if image fails
-        placeholder_text = f"""
-        <para alignment="center">
-        <font size="10" color="#999999">
-        [Image Not Available]<br/>
-        UPC: {item.upc}
-        </font>
-        </para>
-        """
-        return Paragraph(placeholder_text, self.styles['ItemDetail'])
+        # Placeholder if image fails (alignment/font/color come from the style)
+        return Paragraph(PLACEHOLDER_HTML % escape(item.upc), self._placeholder_style)
 
     def _get_item_details(self, item: Item):
         """Get formatted item details"""
-        details_html = f"""
-        <font size="14" color="#1a1a1a"><b>{item.description}</b></font><br/>
-        <br/>
-        <font size="12" color="#1a1a1a">
-        <b>UPC:</b> {item.upc}<br/>
-        <b>Quantity:</b> <font color="#1565c0">{item.original_qty}</font><br/>
-        <b>Size:</b> {item.size}<br/>
-        <b>Color:</b> {item.color}<br/>
-        <br/>
-        <b>Original Retail:</b> <font color="#2e7d32">${int(item.original_retail):,d}</font> <font color="#666666">(each)</font><br/>
-        <br/>
-        <b>Vendor:</b> {item.vendor_name.split('/')[0] if '/' in item.vendor_name else item.vendor_name}<br/>
-        <b>Style #:</b> {item.vendor_style}
-        </font>
-        """
-
-        return Paragraph(details_html, self.styles['ItemDetail'])
-
-    def _create_shipping_page(self, batch: LiquidationBatch) -> List:
+        details_html = ITEM_DETAILS_HTML % {
+            'description': escape(item.description),
+            'upc': escape(item.upc),
+            'qty': item.original_qty,
+            'size': escape(item.size),
+            'color': escape(item.color),
+            'retail': f"{int(item.original_retail):,d}",
+            'vendor': escape(item.vendor_name.split('/', 1)[0]),
+            'style': escape(item.vendor_style),
+        }
+
+        return Paragraph(details_html, self._item_detail_style)
+
+    def _create_shipping_page(self, batch: LiquidationBatch, client_cost: float) -> List:
         """Create shipping information page"""
         content = []
 
@@ -532,7 +598,6 @@ class PDFGenerator:
         content.append(Spacer(1, 0.2*inch))
 
         # Calculate totals
-        client_cost = sum(item.total_client_cost for item in batch.items)
         total_cost = client_cost + shipping_cost
 
         total_data = [
@@ -4,20 +4,54 @@ Handles uploading/downloading PDFs and CSV catalogs to/from S3.
 """
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import ClientError, NoCredentialsError
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, BinaryIO, Tuple
 import logging
 import requests
 from io import BytesIO
 import hashlib
 
 from config import Config
+from http_client import SESSION, fetch_image
+from image_utils import make_thumbnail
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Connection pool sized for concurrent batch/image uploads from worker threads
+BOTO_CLIENT_CONFIG = BotoConfig(
+    max_pool_connections=32,
+    retries={'mode': 'adaptive', 'max_attempts': 3}
+)
+
+# Multipart settings for upload_file (large PDFs upload in parallel 8 MB parts)
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=16,
+    use_threads=True
+)
+
+# Concurrent image downloads/uploads, shared by every batch being uploaded
+# (sized to the boto3 pool above)
+IMAGE_UPLOAD_WORKERS = 32
+_IMAGE_UPLOAD_EXECUTOR = ThreadPoolExecutor(max_workers=IMAGE_UPLOAD_WORKERS, thread_name_prefix='s3-image')
+
+# Bounding box for the JPEG thumbnail stored next to each uploaded image
+# (the PDF catalog renders from it instead of the full-size image)
+THUMBNAIL_SIZE = (400, 400)
+
+# Concurrent delete_objects requests when removing a batch's images
+DELETE_WORKERS = 8
+
+# S3 limit on keys per delete_objects request
+DELETE_BATCH_SIZE = 1000
+
 
 class S3Manager:
     """Manages AWS S3 operations for PDF and catalog files."""
@@ -29,7 +63,8 @@ class S3Manager:
                 's3',
                 aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY,
-                region_name=Config.AWS_REGION
+                region_name=Config.AWS_REGION,
+                config=BOTO_CLIENT_CONFIG
             )
             logger.info(f"S3 Manager initialized")
             logger.info(f"  - PDFs bucket: {Config.AWS_BUCKET_PDFS}")
@@ -69,7 +104,51 @@ class S3Manager:
                 s3_key,
                 ExtraArgs={
                     'ContentType': 'application/pdf'
-                }
+                },
+                Config=TRANSFER_CONFIG
+            )
+
+            # Generate public URL
+            public_url = f"https://{Config.AWS_BUCKET_PDFS}.s3.{Config.AWS_REGION}.amazonaws.com/{s3_key}"
+            logger.info(f"PDF uploaded successfully: {public_url}")
+
+            return public_url
+
+        except ClientError as e:
+            logger.error(f"Failed to upload PDF to S3: {e}")
+            raise
+
+    def upload_pdf_bytes_to_s3(self, pdf_buffer: BinaryIO, batch_number: str) -> str:
+        """
+        Upload an in-memory PDF report to S3 and return public URL.
+
+        Args:
+            pdf_buffer: Binary file object holding the PDF (e.g. BytesIO);
+                        read from the start
+            batch_number: Batch/lot number for naming
+
+        Returns:
+            Public URL to the uploaded PDF
+
+        Raises:
+            ClientError: If S3 upload fails
+        """
+        # S3 key (path in bucket)
+        s3_key = f"{Config.S3_PDF_PREFIX}batch-{batch_number}.pdf"
+
+        try:
+            # Rewind so retries re-send the whole document
+            pdf_buffer.seek(0)
+
+            # Upload file object (public access controlled by bucket policy)
+            self.s3_client.upload_fileobj(
+                pdf_buffer,
+                Config.AWS_BUCKET_PDFS,
+                s3_key,
+                ExtraArgs={
+                    'ContentType': 'application/pdf'
+                },
+                Config=TRANSFER_CONFIG
             )
 
             # Generate public URL
@@ -82,7 +161,7 @@ class S3Manager:
             logger.error(f"Failed to upload PDF to S3: {e}")
             raise
 
-    def download_catalog_from_s3(self, local_path: Optional[str] = None) -> str:
+    def download_catalog_from_s3(self, local_path: Optional[str] = None) -> Optional[str]:
         """
         Download existing catalog CSV from public S3 URL.
 
@@ -91,36 +170,60 @@ class S3Manager:
                        If None, saves to temp directory.
 
         Returns:
-            Local path to downloaded catalog file
+            Local path to downloaded catalog file, or None if no catalog
+            exists yet (any stale local copy is removed)
 
         Raises:
-            Exception: If download fails
+            requests.exceptions.RequestException: If download fails (the
+                local file is left untouched)
         """
         if local_path is None:
             local_path = str(Config.TEMP_DIR / Config.CATALOG_FILENAME)
 
         try:
             # Download from public URL using requests
-            response = requests.get(Config.CATALOG_PUBLIC_URL, timeout=30)
-
-            if response.status_code == 200:
-                # Save to local file
-                with open(local_path, 'wb') as f:
-                    f.write(response.content)
-                logger.info(f"Catalog downloaded from public URL: {local_path}")
-                return local_path
-            elif response.status_code == 404:
+            response = SESSION.get(Config.CATALOG_PUBLIC_URL, timeout=30)
+
+            if response.status_code == 404:
                 # Catalog doesn't exist yet, will create new one
                 logger.warning(f"Catalog not found at public URL, will create new one")
-                return local_path
-            else:
-                logger.error(f"Failed to download catalog: HTTP {response.status_code}")
-                return local_path
+                Path(local_path).unlink(missing_ok=True)
+                return None
+
+            if response.status_code != 200:
+                raise requests.exceptions.HTTPError(f"HTTP {response.status_code}", response=response)
 
         except requests.exceptions.RequestException as e:
-            logger.warning(f"Could not download catalog from public URL: {e}")
-            logger.warning("Will create new catalog if needed")
-            return local_path
+            logger.error(f"Failed to download catalog: {e}")
+            raise
+
+        # Save to local file
+        with open(local_path, 'wb') as f:
+            f.write(response.content)
+        logger.info(f"Catalog downloaded from public URL: {local_path}")
+        return local_path
+
+    def get_catalog_etag(self) -> Optional[str]:
+        """
+        Get the ETag of the catalog object on S3.
+
+        The ETag changes whenever the catalog is re-uploaded, so it can be
+        used as a cache key for the parsed catalog.
+
+        Returns:
+            ETag string, or None if the catalog doesn't exist or can't be read
+        """
+        s3_key = f"{Config.S3_CATALOG_PREFIX}{Config.CATALOG_FILENAME}"
+
+        try:
+            response = self.s3_client.head_object(
+                Bucket=Config.AWS_BUCKET_CATALOG,
+                Key=s3_key
+            )
+            return response['ETag']
+        except ClientError as e:
+            logger.warning(f"Could not read catalog ETag: {e}")
+            return None
 
     def upload_catalog_to_s3(self, csv_path: str) -> str:
         """
@@ -151,7 +254,8 @@ class S3Manager:
                 s3_key,
                 ExtraArgs={
                     'ContentType': 'text/csv'
-                }
+                },
+                Config=TRANSFER_CONFIG
             )
 
             # Return the public URL (same as CATALOG_PUBLIC_URL)
@@ -163,9 +267,9 @@ class S3Manager:
             logger.error(f"Failed to upload catalog to S3: {e}")
             raise
 
-    def upload_image_to_s3(self, image_url: str, batch_number: str, item_index: int) -> Optional[str]:
+    def upload_image_to_s3(self, image_url: str, batch_number: str, item_index: int) -> Optional[Tuple[str, str]]:
         """
-        Download image from URL and upload to S3.
+        Download image from URL and upload it to S3 with a small JPEG thumbnail.
 
         Args:
             image_url: Source image URL
@@ -173,21 +277,18 @@ class S3Manager:
             item_index: Index of item in batch for unique naming
 
         Returns:
-            Public URL to uploaded image on S3, or None if failed
+            Tuple of (image URL, thumbnail URL) on S3, or None if failed.
+            The thumbnail URL is empty if the image couldn't be resized.
         """
         try:
-            # Download image
-            response = requests.get(image_url, timeout=10)
-            response.raise_for_status()
-
-            # Get image content
-            image_data = response.content
+            # Download image (served from the local image cache when possible)
+            image_data, content_type = fetch_image(image_url)
 
             # Generate unique filename using hash to avoid duplicates
-            image_hash = hashlib.md5(image_data).hexdigest()[:12]
+            # (blake2b is faster than md5; 6-byte digest = 12 hex chars)
+            image_hash = hashlib.blake2b(image_data, digest_size=6).hexdigest()
 
             # Determine file extension
-            content_type = response.headers.get('Content-Type', 'image/jpeg')
             ext = '.jpg'
             if 'png' in content_type:
                 ext = '.png'
@@ -208,37 +309,56 @@ class S3Manager:
             )
 
             # Generate public URL
-            public_url = f"https://{Config.AWS_BUCKET_IMAGES}.s3.{Config.AWS_REGION}.amazonaws.com/{s3_key}"
+            base_url = f"https://{Config.AWS_BUCKET_IMAGES}.s3.{Config.AWS_REGION}.amazonaws.com/"
+            public_url = base_url + s3_key
             logger.info(f"Image uploaded: {s3_key}")
 
-            return public_url
-
         except Exception as e:
             logger.warning(f"Failed to upload image from {image_url}: {e}")
             return None
 
-    def upload_images_batch(self, image_urls: List[str], batch_number: str) -> List[str]:
+        # Thumbnail next to the image, resized from the bytes already in hand
+        thumb_key = f"{Config.S3_IMAGES_PREFIX}batch-{batch_number}/item-{item_index}_{image_hash}_thumb.jpg"
+        try:
+            thumb_data, _, _ = make_thumbnail(image_data, THUMBNAIL_SIZE)
+            self.s3_client.put_object(
+                Bucket=Config.AWS_BUCKET_IMAGES,
+                Key=thumb_key,
+                Body=thumb_data,
+                ContentType='image/jpeg'
+            )
+        except Exception as e:
+            logger.warning(f"Failed to upload thumbnail for {image_url}: {e}")
+            return public_url, ''
+
+        return public_url, base_url + thumb_key
+
+    def upload_images_batch(self, image_urls: List[str], batch_number: str) -> List[Tuple[str, str]]:
         """
-        Upload multiple images to S3 from URLs.
+        Upload multiple images (and their thumbnails) to S3 from URLs concurrently.
 
         Args:
-            image_urls: List of source image URLs
+            image_urls: List of source image URLs (one per item; may be empty)
             batch_number: Batch/lot number for organizing
 
         Returns:
-            List of public S3 URLs (empty string for failed uploads)
+            List of (image URL, thumbnail URL) pairs in input order. Failed
+            uploads keep the source URL with no thumbnail; empty input URLs
+            give ('', '').
         """
-        s3_urls = []
-
-        for idx, image_url in enumerate(image_urls):
+        def upload(idx: int, image_url: str) -> Tuple[str, str]:
             if not image_url or not image_url.strip():
-                s3_urls.append('')
-                continue
+                return '', ''
+
+            s3_urls = self.upload_image_to_s3(image_url, batch_number, idx)
+            return s3_urls if s3_urls else (image_url, '')  # Fallback to original URL if upload fails
 
-            s3_url = self.upload_image_to_s3(image_url, batch_number, idx)
-            s3_urls.append(s3_url if s3_url else image_url)  # Fallback to original URL if upload fails
+        # Downloads and PUTs are network bound - run them concurrently on the
+        # shared pool, so concurrent batches don't multiply the thread count
+        # or the full-size decodes in flight (map keeps results in input order)
+        s3_urls = list(_IMAGE_UPLOAD_EXECUTOR.map(upload, range(len(image_urls)), image_urls))
 
-        logger.info(f"Uploaded {len([u for u in s3_urls if u])} images for batch {batch_number}")
+        logger.info(f"Uploaded {sum(1 for _, thumb in s3_urls if thumb)} images with thumbnails for batch {batch_number}")
         return s3_urls
 
     def delete_pdf_from_s3(self, batch_number: str) -> bool:
@@ -278,25 +398,38 @@ class S3Manager:
         prefix = f"{Config.S3_IMAGES_PREFIX}batch-{batch_number}/"
 
         try:
-            # List all objects with this prefix
-            response = self.s3_client.list_objects_v2(
-                Bucket=Config.AWS_BUCKET_IMAGES,
-                Prefix=prefix
-            )
-
-            if 'Contents' in response:
-                # Delete all objects
-                objects_to_delete = [{'Key': obj['Key']} for obj in response['Contents']]
-
-                if objects_to_delete:
-                    self.s3_client.delete_objects(
-                        Bucket=Config.AWS_BUCKET_IMAGES,
-                        Delete={'Objects': objects_to_delete}
-                    )
-                    logger.info(f"Deleted {len(objects_to_delete)} images for batch {batch_number}")
-            else:
+            # Page through every object with this prefix (1000 keys per page)
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            objects_to_delete = [
+                {'Key': obj['Key']}
+                for page in paginator.paginate(Bucket=Config.AWS_BUCKET_IMAGES, Prefix=prefix)
+                for obj in page.get('Contents', [])
+            ]
+
+            if not objects_to_delete:
                 logger.info(f"No images found for batch {batch_number}")
+                return True
+
+            # Delete in chunks of up to 1000 keys, several requests at a time
+            chunks = [
+                objects_to_delete[i:i + DELETE_BATCH_SIZE]
+                for i in range(0, len(objects_to_delete), DELETE_BATCH_SIZE)
+            ]
+            with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+                responses = list(executor.map(
+                    lambda chunk: self.s3_client.delete_objects(
+                        Bucket=Config.AWS_BUCKET_IMAGES,
+                        Delete={'Objects': chunk, 'Quiet': True}
+                    ),
+                    chunks
+                ))
+
+            errors = [error for response in responses for error in response.get('Errors', [])]
+            if errors:
+                logger.error(f"Failed to delete {len(errors)} images for batch {batch_number}: {errors[0]}")
+                return False
 
+            logger.info(f"Deleted {len(objects_to_delete)} images for batch {batch_number}")
             return True
         except ClientError as e:
             logger.error(f"Failed to delete images from S3: {e}")